@@ -0,0 +1,39 @@
+"""
+Archivo de tareas.
+
+Las tareas archivadas se mueven de tasks a archived_tasks con un INSERT ...
+SELECT y un DELETE, así que la carga de tableros, la sincronización, la
+búsqueda y los desplazamientos de posiciones dejan de recorrerlas sin
+necesidad de filtrar nada. Para los clientes cuentan como eliminadas: se
+registra su tombstone y dejan de contar en las estadísticas del usuario. El
+archivo de cada tablero se consulta en GET /kanban/boards/<id>/archive.
+"""
+from datetime import datetime
+from .db import db
+from .models import ArchivedTask, Column, DeletionLog, Task
+
+def archive_tasks(*criteria, user_id=None):
+    """
+    Mueve al archivo las tareas que cumplen `criteria` (condiciones sobre
+    Task). Con `user_id` registra además un tombstone por tarea. No confirma
+    la transacción. Devuelve el número de tareas archivadas.
+    """
+    now = datetime.utcnow()
+    tasks = db.select(
+        Task.id, Task.title, Task.description, Task.position, Task.column_id, Column.name,
+        Task.created_at, Task.updated_at, db.literal(now, db.DateTime), Column.board_id
+    ).join(Column, Task.column_id == Column.id).where(*criteria)
+    db.session.execute(db.insert(ArchivedTask.__table__).from_select([
+        "task_id", "title", "description", "position", "column_id", "column_name",
+        "created_at", "updated_at", "archived_at", "board_id"
+    ], tasks))
+
+    if user_id is not None:
+        db.session.execute(db.insert(DeletionLog.__table__).from_select(
+            ["entity_type", "entity_id", "user_id", "deleted_at"],
+            db.select(db.literal("task"), Task.id, db.literal(user_id), db.literal(now, db.DateTime)).where(*criteria)
+        ))
+
+    return db.session.execute(
+        db.delete(Task).where(*criteria).execution_options(synchronize_session=False)
+    ).rowcount
@@ -0,0 +1,166 @@
+"""
+Caché de instantáneas serializadas de tableros (columnas y tareas).
+
+Cada entrada se guarda por id de tablero junto con la versión del tablero
+(ver Board.version), y solo se sirve si la versión coincide con la actual.
+Además, las operaciones de escritura invalidan las entradas de los tableros
+que modifican (OwnerScope.commit).
+
+El almacenamiento es intercambiable: LRUBackend guarda las entradas en el
+propio proceso y KeyValueBackend usa cualquier cliente con get/set/delete
+compatible con Redis. En las pruebas se puede pasar un sustituto local.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+
+class CacheBackend:
+    """Interfaz de almacenamiento de la caché."""
+
+    evictions = 0
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def __len__(self):
+        return 0
+
+class LRUBackend(CacheBackend):
+    """Caché en memoria del proceso con expulsión por tamaño (LRU) y por antigüedad (TTL)."""
+
+    def __init__(self, max_entries=1024, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if self.ttl and expires_at < time.monotonic():
+                del self._entries[key]
+                self.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+class KeyValueBackend(CacheBackend):
+    """
+    Caché en un almacén externo. `client` debe ofrecer get(key), set(key, value, ex=ttl)
+    y delete(key), como redis.Redis. Los valores se guardan como JSON.
+    """
+
+    def __init__(self, client, prefix="kanban:board:", ttl=300):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + str(key))
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key, value):
+        self.client.set(self.prefix + str(key), json.dumps(value), ex=self.ttl or None)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + str(key))
+
+class BoardCache:
+    """Caché de columnas serializadas por (tablero, versión), con contadores."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, board_id, version):
+        entry = self.backend.get(board_id)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def set(self, board_id, version, columns):
+        self.backend.set(board_id, [version, columns])
+
+    def invalidate(self, board_ids):
+        for board_id in board_ids:
+            self.backend.delete(board_id)
+            self.invalidations += 1
+
+    def stats(self):
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.backend.evictions,
+            "invalidations": self.invalidations
+        }
+
+class NullCache(BoardCache):
+    """Caché desactivada: nunca guarda nada."""
+
+    def __init__(self):
+        super().__init__(CacheBackend())
+
+    def get(self, board_id, version):
+        self.misses += 1
+        return None
+
+    def set(self, board_id, version, columns):
+        pass
+
+    def invalidate(self, board_ids):
+        pass
+
+def create_board_cache(config):
+    """Crea la caché según BOARD_CACHE_BACKEND: "lru" (por defecto), "redis" o "none"."""
+    kind = config.get("BOARD_CACHE_BACKEND", "lru")
+    ttl = int(config.get("BOARD_CACHE_TTL", 300))
+    if kind == "none":
+        return NullCache()
+    if kind == "redis":
+        # Dependencia opcional: solo se necesita si se usa este backend
+        import redis
+        client = redis.Redis.from_url(config["BOARD_CACHE_REDIS_URL"])
+        return BoardCache(KeyValueBackend(client, ttl=ttl))
+    if kind != "lru":
+        raise ValueError(f"Unknown BOARD_CACHE_BACKEND {kind!r}")
+    return BoardCache(LRUBackend(int(config.get("BOARD_CACHE_MAX_ENTRIES", 1024)), ttl))
+
+def get_board_cache():
+    """Caché de la aplicación actual, creada la primera vez que se usa."""
+    cache = current_app.extensions.get("board_cache")
+    if cache is None:
+        cache = current_app.extensions["board_cache"] = create_board_cache(current_app.config)
+    return cache
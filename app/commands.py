@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta
+import click
+from flask.cli import with_appcontext
+from .archive import archive_tasks
+from .db import db
+from .models import Board, Column, Task, User
+from .operations import OwnerScope, bump_board_versions
+from .purge import purge_deleted_boards
+from .search import refresh_search_vectors
+from .stats import reconcile_user_stats
+from .ranking import MAX_RANK_LENGTH, normalize_board_columns, normalize_column_tasks
+
+@click.command("normalize-ordering")
+@click.option("--from-mode", type=click.Choice(["position", "rank"]), default=None,
+              help="Orden de origen. Por defecto, el ORDERING_MODE configurado.")
+@with_appcontext
+def normalize_ordering_command(from_mode):
+    """
+    Migra el orden de todos los tableros: reescribe posiciones densas y rangos
+    a partir del orden de origen. Hay que ejecutarlo al cambiar ORDERING_MODE,
+    indicando el modo anterior con --from-mode.
+    """
+    by_rank = None if from_mode is None else from_mode == "rank"
+    board_ids = db.session.execute(db.select(Board.id).order_by(Board.id)).scalars().all()
+    columns_total = tasks_total = 0
+    for board_id in board_ids:
+        columns_total += normalize_board_columns(board_id, by_rank)
+        column_ids = db.session.execute(
+            db.select(Column.id).where(Column.board_id == board_id)
+        ).scalars().all()
+        for column_id in column_ids:
+            tasks_total += normalize_column_tasks(column_id, by_rank)
+        bump_board_versions({board_id})
+        # Una transacción por tablero para no mantener bloqueos mucho tiempo
+        db.session.commit()
+    click.echo(f"Normalized {columns_total} columns and {tasks_total} tasks in {len(board_ids)} boards")
+
+@click.command("rebalance-ranks")
+@with_appcontext
+def rebalance_ranks_command():
+    """Reequilibra las columnas cuyas claves de orden superan MAX_RANK_LENGTH."""
+    long_rank = db.func.length(Task.rank) > MAX_RANK_LENGTH
+    rows = db.session.execute(
+        db.select(Task.column_id, Column.board_id).join(Column).where(long_rank).distinct()
+    ).all()
+    for column_id, board_id in rows:
+        normalize_column_tasks(column_id)
+        bump_board_versions({board_id})
+        db.session.commit()
+
+    board_ids = db.session.execute(
+        db.select(Column.board_id).where(db.func.length(Column.rank) > MAX_RANK_LENGTH).distinct()
+    ).scalars().all()
+    for board_id in board_ids:
+        normalize_board_columns(board_id)
+        bump_board_versions({board_id})
+        db.session.commit()
+    click.echo(f"Rebalanced {len(rows)} columns and {len(board_ids)} boards")
+
+@click.command("reconcile-stats")
+@with_appcontext
+def reconcile_stats_command():
+    """Recalcula desde cero los contadores de GET /kanban/stats de todos los usuarios."""
+    user_ids = db.session.execute(db.select(User.id)).scalars().all()
+    reconcile_user_stats(user_ids)
+    db.session.commit()
+    click.echo(f"Reconciled stats for {len(user_ids)} users")
+
+@click.command("reindex-search")
+@with_appcontext
+def reindex_search_command():
+    """Recalcula el documento de búsqueda de todas las tareas, columna a columna."""
+    column_ids = db.session.execute(db.select(Column.id).order_by(Column.id)).scalars().all()
+    tasks_total = 0
+    for column_id in column_ids:
+        tasks_total += refresh_search_vectors(Task.column_id == column_id)
+        db.session.commit()
+    click.echo(f"Reindexed {tasks_total} tasks in {len(column_ids)} columns")
+
+@click.command("purge-deleted-boards")
+@click.option("--batch-size", type=int, default=None, help="Tareas por transacción. Por defecto, PURGE_BATCH_SIZE.")
+@with_appcontext
+def purge_deleted_boards_command(batch_size):
+    """Borra por lotes las filas de los tableros eliminados de forma diferida (ver app/purge.py)."""
+    boards, tasks = purge_deleted_boards(batch_size)
+    click.echo(f"Purged {boards} boards and {tasks} tasks")
+
+@click.command("archive-done-tasks")
+@click.option("--column-name", default="Done", show_default=True,
+              help="Nombre de las columnas cuyas tareas se archivan (sin distinguir mayúsculas).")
+@click.option("--older-than-days", type=int, default=30, show_default=True,
+              help="Solo las tareas sin cambios desde hace más de estos días.")
+@click.option("--batch-size", type=int, default=500, show_default=True, help="Tareas por transacción.")
+@with_appcontext
+def archive_done_tasks_command(column_name, older_than_days, batch_size):
+    """
+    Mueve al archivo (ver app/archive.py) las tareas antiguas de las columnas
+    con el nombre indicado. Cada lote es una transacción corta que, como una
+    operación normal, registra tombstones, ajusta las estadísticas, incrementa
+    la versión del tablero y publica un evento "tasks.archived".
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    columns = db.session.execute(
+        db.select(Column.id, Column.board_id, Board.user_id).join(Board, Column.board_id == Board.id).where(
+            db.func.lower(Column.name) == column_name.lower(),
+            Board.deleted_at.is_(None)
+        ).order_by(Column.id)
+    ).all()
+    db.session.commit()
+
+    tasks_total = 0
+    for column_id, board_id, user_id in columns:
+        while True:
+            task_ids = db.session.execute(
+                db.select(Task.id).where(Task.column_id == column_id, Task.updated_at < cutoff).order_by(
+                    Task.id
+                ).limit(batch_size)
+            ).scalars().all()
+            if not task_ids:
+                break
+            scope = OwnerScope(user_id)
+            scope.touch(board_id)
+            archived = archive_tasks(Task.id.in_(task_ids), user_id=user_id)
+            scope.count(tasks=-archived)
+            scope.emit(board_id, "tasks.archived", column_id=column_id, task_ids=task_ids)
+            scope.commit()
+            tasks_total += archived
+    click.echo(f"Archived {tasks_total} tasks from {len(columns)} columns")
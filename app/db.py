@@ -1,3 +1,32 @@
+import sqlite3
+from flask import g, has_app_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql import Select
 
-db = SQLAlchemy()
+class RoutingSession(Session):
+    """
+    Envía las consultas SELECT al bind de lectura elegido para la petición
+    (g.read_bind, ver app/replicas.py). Las escrituras, los flush, los
+    SELECT ... FOR UPDATE y cualquier otra sentencia van siempre al primario.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and has_app_context() and not self._flushing
+                and isinstance(clause, Select) and clause._for_update_arg is None):
+            read_bind = g.get("read_bind")
+            if read_bind is not None:
+                return self._db.engines[read_bind]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+@event.listens_for(Engine, "connect")
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # SQLite no aplica las claves foráneas (ni ON DELETE CASCADE) si no se activan en cada conexión
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys = ON")
+        cursor.close()
@@ -0,0 +1,232 @@
+"""
+Feed de cambios de los tableros para GET /kanban/boards/<id>/events (Server-Sent Events).
+
+Las operaciones registran eventos compactos con OwnerScope.emit() y commit()
+los publica cuando la transacción se confirma, junto con la nueva versión del
+tablero. El cliente compara esa versión con la de su ETag para detectar si se
+ha perdido algo; los eventos de tipo "resync" le piden que recargue el tablero.
+
+Brokers (EVENTS_BACKEND):
+    memory    reparte los eventos entre los suscriptores del propio proceso;
+              solo sirve con un único proceso.
+    postgres  envía los eventos con pg_notify dentro de la transacción (así
+              solo se entregan si se confirma) y cada proceso los recibe con
+              LISTEN en una conexión dedicada, de modo que llegan a los
+              suscriptores de todos los workers y nodos.
+    auto      postgres si la base de datos es PostgreSQL, memory si no.
+
+Cada suscriptor es solo una cola en memoria. La conexión HTTP sí ocupa el
+hilo que la atiende, así que para miles de suscriptores ociosos por nodo hay
+que servir con workers gevent (GUNICORN_WORKER_CLASS=gevent, ver
+gunicorn.conf.py), donde cada conexión es una greenlet.
+"""
+import json
+import logging
+import queue
+import select
+import threading
+import time
+from flask import current_app
+from .db import db
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "kanban_events"
+
+# Límite de pg_notify (8000 bytes) con margen
+MAX_NOTIFY_PAYLOAD = 7500
+
+class Subscription:
+    """Cola de eventos de un tablero para un cliente."""
+
+    def __init__(self, broker, board_id, max_pending):
+        self.broker = broker
+        self.board_id = board_id
+        self.queue = queue.Queue(maxsize=max_pending)
+
+    def get(self, timeout):
+        """Siguiente evento, o None si no llega ninguno en `timeout` segundos."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+class MemoryBroker:
+    """Reparte los eventos entre los suscriptores de este proceso."""
+
+    def __init__(self, max_pending=100):
+        self.max_pending = max_pending
+        self.published = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, board_id):
+        subscription = Subscription(self, board_id, self.max_pending)
+        with self._lock:
+            self._subscribers.setdefault(board_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.board_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.board_id]
+
+    def stage(self, events):
+        """Se llama antes del commit. Este broker no necesita hacer nada."""
+
+    def publish(self, events):
+        """Se llama después del commit."""
+        for event in events:
+            self.dispatch(event)
+
+    def dispatch(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(event["board_id"], ()))
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(event)
+            except queue.Full:
+                # Cliente demasiado lento: se descartan sus eventos pendientes
+                # y se le pide que recargue el tablero
+                self.dropped += 1
+                _reset(subscription, event["board_id"])
+        self.published += 1
+
+    def resync_all(self):
+        """Pide a todos los suscriptores que recarguen (por ejemplo, tras perder eventos)."""
+        with self._lock:
+            subscribers = [s for group in self._subscribers.values() for s in group]
+        for subscription in subscribers:
+            _reset(subscription, subscription.board_id)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": type(self).__name__,
+                "boards": len(self._subscribers),
+                "subscribers": sum(len(group) for group in self._subscribers.values()),
+                "published": self.published,
+                "dropped": self.dropped
+            }
+
+def _reset(subscription, board_id):
+    while True:
+        try:
+            subscription.queue.get_nowait()
+        except queue.Empty:
+            break
+    try:
+        subscription.queue.put_nowait({"type": "resync", "board_id": board_id, "version": None})
+    except queue.Full:
+        pass
+
+class PostgresBroker(MemoryBroker):
+    """Publica con NOTIFY y recibe con LISTEN, para repartir entre procesos."""
+
+    def __init__(self, engine, max_pending=100):
+        super().__init__(max_pending)
+        self.engine = engine
+        self._listener = None
+        self._listener_lock = threading.Lock()
+        self._listening = threading.Event()
+
+    def subscribe(self, board_id):
+        self._ensure_listener()
+        # Sin LISTEN activo se perderían los eventos confirmados mientras tanto
+        self._listening.wait(timeout=5)
+        return super().subscribe(board_id)
+
+    def stage(self, events):
+        # NOTIFY es transaccional: los eventos se entregan solo si el commit tiene éxito
+        for event in events:
+            payload = json.dumps(event, separators=(",", ":"))
+            if len(payload) > MAX_NOTIFY_PAYLOAD:
+                payload = json.dumps({"type": "resync", "board_id": event["board_id"], "version": event["version"]})
+            db.session.execute(db.select(db.func.pg_notify(CHANNEL, payload)))
+
+    def publish(self, events):
+        # Este mismo proceso también los recibe por LISTEN
+        pass
+
+    def _ensure_listener(self):
+        with self._listener_lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, name="kanban-events-listener", daemon=True)
+                self._listener.start()
+
+    def _connect(self):
+        import psycopg2
+        import psycopg2.extensions
+        dsn = self.engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        connection = psycopg2.connect(dsn)
+        connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANNEL}")
+        return connection
+
+    def _listen(self):
+        import psycopg2
+        reconnecting = False
+        while True:
+            connection = None
+            try:
+                connection = self._connect()
+                self._listening.set()
+                if reconnecting:
+                    # Los eventos enviados mientras no escuchábamos se han perdido
+                    self.resync_all()
+                reconnecting = False
+                while True:
+                    if select.select([connection], [], [], 30) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notify = connection.notifies.pop(0)
+                        self.dispatch(json.loads(notify.payload))
+            except (psycopg2.Error, OSError, ValueError) as e:
+                logger.warning("Event listener disconnected: %s", e)
+                self._listening.clear()
+                reconnecting = True
+                if connection is not None:
+                    connection.close()
+                time.sleep(1)
+
+def create_event_broker(config, engine):
+    kind = config.get("EVENTS_BACKEND", "auto")
+    max_pending = int(config.get("EVENTS_MAX_PENDING", 100))
+    if kind == "auto":
+        kind = "postgres" if engine.dialect.name == "postgresql" else "memory"
+    if kind == "postgres":
+        return PostgresBroker(engine, max_pending)
+    if kind != "memory":
+        raise ValueError(f"Unknown EVENTS_BACKEND {kind!r}")
+    return MemoryBroker(max_pending)
+
+_broker_lock = threading.Lock()
+
+def get_event_broker():
+    """Broker de la aplicación actual, creado la primera vez que se usa."""
+    broker = current_app.extensions.get("event_broker")
+    if broker is None:
+        # Todos los hilos deben compartir el mismo broker
+        with _broker_lock:
+            broker = current_app.extensions.get("event_broker")
+            if broker is None:
+                broker = current_app.extensions["event_broker"] = create_event_broker(current_app.config, db.engine)
+    return broker
+
+def format_sse(event_type, data, event_id=None):
+    """Serializa un evento en el formato de texto de Server-Sent Events."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append("data: " + json.dumps(data, separators=(",", ":")))
+    return "\n".join(lines) + "\n\n"
@@ -0,0 +1,65 @@
+"""
+Configuración de logging de la aplicación.
+
+Todos los módulos usan `logging.getLogger(__name__)`, es decir, loggers hijos
+de "app". Se configuran con:
+
+    LOG_LEVEL   DEBUG, INFO (por defecto), WARNING, ERROR u OFF
+    LOG_FORMAT  "text" (por defecto) o "json", una línea JSON por registro
+
+Los campos pasados en `extra=` aparecen como claves del JSON (o al final de
+la línea en formato texto).
+"""
+import json
+import logging
+import sys
+from datetime import datetime, timezone
+
+# Atributos propios de LogRecord: el resto son campos añadidos con extra=
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+def _extra_fields(record):
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_FIELDS}
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        entry.update(_extra_fields(record))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record):
+        line = super().format(record)
+        extra = _extra_fields(record)
+        if extra:
+            line += " " + " ".join(f"{key}={value}" for key, value in extra.items())
+        return line
+
+def configure_logging(config):
+    """Configura el logger "app" según LOG_LEVEL y LOG_FORMAT de la configuración."""
+    logger = logging.getLogger("app")
+    level = str(config.get("LOG_LEVEL", "INFO")).upper()
+
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.propagate = False
+    if level == "OFF":
+        logger.disabled = True
+        return logger
+    logger.disabled = False
+
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if config.get("LOG_FORMAT") == "json" else TextFormatter())
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    return logger
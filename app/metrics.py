@@ -0,0 +1,322 @@
+"""
+Métricas por petición expuestas en GET /metrics con el formato de texto de Prometheus.
+
+Para cada ruta (la regla de URL, no la URL concreta, para acotar las series)
+se registran histogramas de la duración de la petición, del número de
+sentencias SQL, del tiempo pasado en la base de datos y del tamaño de la
+respuesta. Las sentencias se cuentan con eventos del Engine de SQLAlchemy.
+
+Las peticiones más lentas que SLOW_REQUEST_MS se registran en el log junto
+con las sentencias que ejecutaron (0 lo desactiva). METRICS_ENABLED=false
+desactiva todo el módulo.
+
+Cada proceso lleva sus propias métricas. Con METRICS_MULTIPROC_DIR, cada
+proceso escribe además una copia en ese directorio cada
+METRICS_FLUSH_SECONDS y al terminar, y /metrics devuelve la suma de las de
+todos los workers. Las copias de los workers que ya terminaron se
+conservan para que los contadores no retrocedan al reciclarlos;
+gunicorn.conf.py vacía el directorio al arrancar. Sin él, cada lectura de
+/metrics devuelve solo las del worker que la atiende.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STATEMENT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Sentencias guardadas por petición para el log de peticiones lentas
+MAX_CAPTURED_STATEMENTS = 50
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+class MetricsRegistry:
+    """Histogramas y contadores con etiquetas, seguros entre hilos."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._help = {}
+
+    def describe(self, name, kind, text):
+        self._help[name] = (kind, text)
+
+    def observe(self, name, labels, value, buckets):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def inc(self, name, labels, value=1):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def snapshot(self):
+        """Copia de todas las series que se puede guardar como JSON."""
+        with self._lock:
+            return {
+                "histograms": {
+                    name: [[list(key), histogram.buckets, list(histogram.counts), histogram.sum, histogram.count]
+                           for key, histogram in series.items()]
+                    for name, series in self._histograms.items()
+                },
+                "counters": {
+                    name: [[list(key), value] for key, value in series.items()]
+                    for name, series in self._counters.items()
+                }
+            }
+
+    def merge(self, snapshot):
+        """Suma a este registro las series de un snapshot() de otro registro."""
+        with self._lock:
+            for name, series in snapshot["histograms"].items():
+                histograms = self._histograms.setdefault(name, {})
+                for key, buckets, counts, total, count in series:
+                    key = tuple(tuple(pair) for pair in key)
+                    histogram = histograms.get(key)
+                    if histogram is None:
+                        histogram = histograms[key] = Histogram(tuple(buckets))
+                    histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+                    histogram.sum += total
+                    histogram.count += count
+            for name, series in snapshot["counters"].items():
+                counters = self._counters.setdefault(name, {})
+                for key, value in series:
+                    key = tuple(tuple(pair) for pair in key)
+                    counters[key] = counters.get(key, 0) + value
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                self._header(lines, name)
+                for key, histogram in sorted(series.items()):
+                    labels = dict(key)
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        lines.append(f"{name}_bucket{_labels(labels, le=_number(bound))} {count}")
+                    lines.append(f"{name}_bucket{_labels(labels, le='+Inf')} {histogram.count}")
+                    lines.append(f"{name}_sum{_labels(labels)} {_number(histogram.sum)}")
+                    lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+            for name, series in sorted(self._counters.items()):
+                self._header(lines, name)
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_labels(dict(key))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _header(self, lines, name):
+        if name in self._help:
+            kind, text = self._help[name]
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(labels, **extra):
+    labels = dict(labels, **extra)
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+class SharedMetrics:
+    """
+    Métricas de varios procesos a través de un directorio compartido. Cada
+    proceso escribe el snapshot() de su registro en su propio fichero desde
+    un hilo y al terminar; collect() suma los de todos.
+    """
+
+    def __init__(self, registry, directory, flush_seconds):
+        self.registry = registry
+        self.directory = directory
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._pid = None
+        self._path = None
+
+    def ensure_started(self):
+        """Arranca la escritura periódica en este proceso; tras un fork se vuelve a arrancar."""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            # El pid se reutiliza: la hora de arranque evita pisar el fichero de otro worker
+            self._path = os.path.join(self.directory, f"{pid}-{time.time_ns()}.json")
+            self._pid = pid
+            threading.Thread(target=self._flush_periodically, name="metrics-flush", daemon=True).start()
+            atexit.register(self.flush)
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            self.flush()
+
+    def flush(self):
+        """Escribe el snapshot de este proceso. Se reemplaza el fichero entero para no leerlo a medias."""
+        if self._pid != os.getpid():
+            return
+        temporary = self._path + ".tmp"
+        try:
+            with open(temporary, "w") as f:
+                json.dump(self.registry.snapshot(), f)
+            os.replace(temporary, self._path)
+        except OSError as e:
+            logger.warning("Could not write metrics to %s: %s", self._path, e)
+
+    def collect(self):
+        """Registro nuevo con la suma de las métricas de todos los procesos."""
+        self.ensure_started()
+        self.flush()
+        merged = MetricsRegistry()
+        merged._help.update(self.registry._help)
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as f:
+                    merged.merge(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.warning("Could not read metrics from %s: %s", name, e)
+        return merged
+
+registry = MetricsRegistry()
+registry.describe("kanban_request_duration_seconds", "histogram", "Request duration in seconds")
+registry.describe("kanban_request_sql_statements", "histogram", "SQL statements executed per request")
+registry.describe("kanban_request_db_seconds", "histogram", "Time spent in the database per request, in seconds")
+registry.describe("kanban_response_size_bytes", "histogram", "Response body size in bytes")
+registry.describe("kanban_slow_requests_total", "counter", "Requests slower than SLOW_REQUEST_MS")
+
+# --- Eventos de SQLAlchemy ---
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and "request_metrics" in g:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not (has_request_context() and "request_metrics" in g):
+        return
+    started = conn.info.get("query_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    metrics = g.request_metrics
+    metrics["statements"] += 1
+    metrics["db_seconds"] += elapsed
+    if metrics["captured"] is not None and len(metrics["captured"]) < MAX_CAPTURED_STATEMENTS:
+        metrics["captured"].append({"sql": statement, "ms": round(elapsed * 1000, 2)})
+
+_listening = False
+
+def _listen_engine_events():
+    # Se escucha en la clase Engine para cubrir cualquier engine o bind configurado
+    global _listening
+    if not _listening:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _listening = True
+
+# --- Hooks de Flask ---
+
+def _endpoint_label():
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+def init_metrics(app):
+    """Registra los hooks de medición y la ruta /metrics si METRICS_ENABLED está activo."""
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+    _listen_engine_events()
+    slow_request_ms = app.config.get("SLOW_REQUEST_MS", 0)
+    shared = None
+    if app.config.get("METRICS_MULTIPROC_DIR"):
+        shared = SharedMetrics(registry, app.config["METRICS_MULTIPROC_DIR"], app.config.get("METRICS_FLUSH_SECONDS", 5))
+
+    @app.before_request
+    def start_request_metrics():
+        if shared is not None:
+            shared.ensure_started()
+        g.request_metrics = {
+            "started": time.perf_counter(),
+            "statements": 0,
+            "db_seconds": 0.0,
+            "captured": [] if slow_request_ms else None,
+            "status": None,
+            "size": None
+        }
+
+    @app.after_request
+    def capture_response_metrics(response):
+        metrics = g.get("request_metrics")
+        if metrics is not None:
+            metrics["status"] = response.status_code
+            # Las respuestas en streaming no tienen longitud conocida, y
+            # calculate_content_length() las consumiría enteras
+            metrics["size"] = None if response.is_streamed else response.calculate_content_length()
+        return response
+
+    # Se registra al cerrar el contexto de la petición, que en las respuestas
+    # en streaming (stream_with_context) llega cuando termina el cuerpo
+    @app.teardown_request
+    def record_request_metrics(error=None):
+        metrics = g.pop("request_metrics", None)
+        if metrics is None or request.endpoint == "metrics":
+            return
+        duration = time.perf_counter() - metrics["started"]
+        endpoint = _endpoint_label()
+        status = metrics["status"] or 500
+        labels = {"method": request.method, "endpoint": endpoint}
+
+        registry.observe("kanban_request_duration_seconds", dict(labels, status=status), duration, DURATION_BUCKETS)
+        registry.observe("kanban_request_sql_statements", labels, metrics["statements"], STATEMENT_BUCKETS)
+        registry.observe("kanban_request_db_seconds", labels, metrics["db_seconds"], DURATION_BUCKETS)
+        if metrics["size"] is not None:
+            registry.observe("kanban_response_size_bytes", labels, metrics["size"], SIZE_BUCKETS)
+
+        if slow_request_ms and duration * 1000 >= slow_request_ms:
+            registry.inc("kanban_slow_requests_total", labels)
+            logger.warning("Slow request", extra={
+                "method": request.method,
+                "path": request.full_path.rstrip("?"),
+                "endpoint": endpoint,
+                "status": status,
+                "duration_ms": round(duration * 1000, 1),
+                "sql_statements": metrics["statements"],
+                "db_ms": round(metrics["db_seconds"] * 1000, 1),
+                "statements": metrics["captured"]
+            })
+
+    @app.route("/metrics", endpoint="metrics")
+    def metrics_endpoint():
+        source = shared.collect() if shared is not None else registry
+        return Response(source.render(), mimetype="text/plain; version=0.0.4")
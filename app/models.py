@@ -1,7 +1,6 @@
-from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
-
-db = SQLAlchemy()
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from .db import db
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -12,40 +11,123 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relación con Board
-    boards = db.relationship('Board', backref='user', lazy=True, cascade='all, delete-orphan')
+    boards = db.relationship('Board', backref='user', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
 
 class Board(db.Model):
     __tablename__ = 'boards'
+    __table_args__ = (
+        # Listado paginado por (created_at, id) y sincronización incremental
+        db.Index('ix_boards_user_created', 'user_id', 'created_at', 'id'),
+        db.Index('ix_boards_user_updated', 'user_id', 'updated_at'),
+        # Tableros pendientes de purga (app/purge.py)
+        db.Index('ix_boards_deleted_at', 'deleted_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    # Se incrementa con cada cambio del tablero, sus columnas o sus tareas (ETag)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    # Plantilla reutilizable: no aparece en GET /boards, sí en GET /templates
+    is_template = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
+    # Tablero eliminado a la espera de que se purguen sus filas (ver app/purge.py)
+    deleted_at = db.Column(db.DateTime)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     
-    # Relación con Column
-    columns = db.relationship('Column', backref='board', lazy=True, cascade='all, delete-orphan')
+    # Relación con Column. Las filas hijas las borra la base de datos (ON DELETE
+    # CASCADE); passive_deletes evita que el ORM las cargue para borrarlas una a una
+    columns = db.relationship('Column', backref='board', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+
+    @classmethod
+    def owned_by(cls, user_id):
+        """Condición de los tableros visibles de un usuario: excluye los pendientes de purga."""
+        return db.and_(cls.user_id == user_id, cls.deleted_at.is_(None))
 
 class Column(db.Model):
     __tablename__ = 'columns'
+    __table_args__ = (
+        # Columnas de un tablero en orden, en los dos modos de ordenación
+        db.Index('ix_columns_board_position', 'board_id', 'position'),
+        db.Index('ix_columns_board_rank', 'board_id', 'rank'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
     position = db.Column(db.Integer, default=0)
+    rank = db.Column(db.String(64))  # Clave de orden en el modo "rank" (ver app/ranking.py)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    board_id = db.Column(db.Integer, db.ForeignKey('boards.id'), nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    board_id = db.Column(db.Integer, db.ForeignKey('boards.id', ondelete='CASCADE'), nullable=False)
     
     # Relación con Task
-    tasks = db.relationship('Task', backref='column', lazy=True, cascade='all, delete-orphan')
+    tasks = db.relationship('Task', backref='column', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
 
 class Task(db.Model):
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # Tareas de una columna en orden: carga, desplazamientos y MAX(position)
+        db.Index('ix_tasks_column_position', 'column_id', 'position'),
+        db.Index('ix_tasks_column_rank', 'column_id', 'rank'),
+        # Búsqueda de texto completo (ver app/search.py); solo existe en PostgreSQL
+        db.Index('ix_tasks_search_vector', 'search_vector', postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(500), nullable=False)
     description = db.Column(db.Text)
     position = db.Column(db.Integer, default=0)
+    rank = db.Column(db.String(64))  # Clave de orden en el modo "rank" (ver app/ranking.py)
+    # Documento de búsqueda: tsvector en PostgreSQL, texto en minúsculas en el resto (ver app/search.py).
+    # Diferido para no cargarlo al leer tableros.
+    search_vector = db.deferred(db.Column(db.Text().with_variant(TSVECTOR(), 'postgresql')))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    column_id = db.Column(db.Integer, db.ForeignKey('columns.id'), nullable=False)
\ No newline at end of file
+    column_id = db.Column(db.Integer, db.ForeignKey('columns.id', ondelete='CASCADE'), nullable=False)
+
+class ArchivedTask(db.Model):
+    """Tareas archivadas, fuera de la tabla tasks para que no pesen en las consultas frecuentes (ver app/archive.py)."""
+    __tablename__ = 'archived_tasks'
+    __table_args__ = (
+        # Archivo paginado de un tablero por (archived_at, id), en orden descendente
+        db.Index('ix_archived_tasks_board_archived', 'board_id', 'archived_at', 'id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    task_id = db.Column(db.Integer, nullable=False)  # Id que tenía en tasks
+    title = db.Column(db.String(500), nullable=False)
+    description = db.Column(db.Text)
+    position = db.Column(db.Integer)
+    # La columna puede eliminarse después: se guarda también su nombre
+    column_id = db.Column(db.Integer)
+    column_name = db.Column(db.String(200))
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    board_id = db.Column(db.Integer, db.ForeignKey('boards.id', ondelete='CASCADE'), nullable=False)
+
+class DeletionLog(db.Model):
+    """Registro de entidades eliminadas, usado como tombstones en la sincronización incremental."""
+    __tablename__ = 'deletion_log'
+    __table_args__ = (
+        db.Index('ix_deletion_log_user_deleted', 'user_id', 'deleted_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    entity_type = db.Column(db.String(20), nullable=False)  # 'board', 'column' o 'task'
+    entity_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+
+class UserStats(db.Model):
+    """Contadores por usuario mantenidos por las operaciones de escritura (ver app/stats.py)."""
+    __tablename__ = 'user_stats'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    boards_count = db.Column(db.Integer, nullable=False, default=0)
+    columns_count = db.Column(db.Integer, nullable=False, default=0)
+    tasks_count = db.Column(db.Integer, nullable=False, default=0)
+    # Cambia con cada escritura del usuario: ETag de GET /kanban/boards
+    boards_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,812 @@
+"""
+Operaciones de escritura del tablero kanban.
+
+Cada operación recibe un OwnerScope y un diccionario de parámetros, hace sus
+cambios en la sesión sin confirmarlos y devuelve (cuerpo, código HTTP). Las
+rutas individuales ejecutan una operación y confirman; POST /kanban/batch
+ejecuta varias dentro de una sola transacción.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from .archive import archive_tasks
+from .cache import get_board_cache
+from .db import db
+from .events import get_event_broker
+from .models import Board, Column, Task, DeletionLog
+from .purge import schedule_purge, soft_delete_enabled
+from .search import search_document
+from .stats import adjust_user_stats, count_board_contents, count_column_tasks
+from .ranking import (
+    MAX_RANK_LENGTH, initial_ranks, normalize_board_columns, normalize_column_tasks,
+    rank_between, rank_mode_enabled, task_order
+)
+
+class OperationError(Exception):
+    """Error esperado de una operación: se devuelve al cliente como {"message": ...}."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+# Duración máxima de una escritura sobre tableros que ya existían. Sus filas
+# se marcan con la hora del servidor al escribirlas, no al confirmar, y la
+# sincronización incremental solo repasa este margen antes del cursor
+# (SYNC_CURSOR_OVERLAP en app/routes.py): commit() rechaza las más lentas
+MAX_WRITE_DURATION = timedelta(seconds=5)
+
+def board_etag(board_id, version):
+    """ETag (sin comillas) de un tablero en una versión concreta."""
+    return f"b{board_id}v{version}"
+
+def bump_board_versions(board_ids):
+    """Incrementa con una sola sentencia la versión de los tableros indicados."""
+    if board_ids:
+        Board.query.filter(Board.id.in_(board_ids)).update(
+            {Board.version: Board.version + 1}, synchronize_session="fetch"
+        )
+
+def stamp_created_boards(board_ids):
+    """
+    Marca los tableros creados en la transacción con la hora de confirmarla.
+    La sincronización incremental devuelve entero cada tablero creado después
+    del cursor, así que las filas que una copia o una importación grandes
+    escribieron con la hora de su inicio no se pierden aunque tarden.
+    """
+    if board_ids:
+        now = datetime.utcnow()
+        Board.query.filter(Board.id.in_(board_ids)).update(
+            {Board.created_at: now, Board.updated_at: now}, synchronize_session="fetch"
+        )
+
+class OwnerScope:
+    """
+    Carga tableros, columnas y tareas comprobando que pertenezcan al usuario.
+    La propiedad de cada tablero se comprueba una sola vez; prefetch() permite
+    además cargar de una vez todas las entidades que usará un lote.
+
+    Las operaciones marcan con touch() los tableros que modifican antes de
+    bloquear columnas o escribir; touch() bloquea sus filas y commit()
+    incrementa su versión una sola vez y confirma la transacción. Si `if_match`
+    contiene ETags (werkzeug.datastructures.ETags), touch() exige que la
+    versión actual del tablero coincida.
+
+    Los eventos registrados con emit() se publican en el feed de cambios
+    (app/events.py) cuando commit() confirma la transacción.
+
+    Los tableros nuevos se anotan en `created`: commit() los marca con la hora
+    de confirmar (stamp_created_boards) y solo exige MAX_WRITE_DURATION a las
+    transacciones que modifican tableros existentes.
+    """
+
+    def __init__(self, user_id, if_match=None):
+        self.user_id = user_id
+        self.if_match = if_match
+        self.touched = set()
+        self.created = set()
+        # Las filas escritas se marcan con una hora posterior a esta
+        self.started = datetime.utcnow()
+        self.events = []
+        # Funciones a ejecutar después del commit
+        self.callbacks = []
+        # Diferencias pendientes en los contadores del usuario (app/stats.py)
+        self.counts = {"boards": 0, "columns": 0, "tasks": 0}
+        self._boards = {}
+        self._columns = {}
+        self._tasks = {}
+        self._task_boards = {}
+        # Versión de los tableros ya bloqueados en esta transacción
+        self._locked = {}
+
+    def prefetch(self, board_ids=(), column_ids=(), task_ids=(), lock=False):
+        """
+        Carga con una consulta por tipo las entidades del usuario indicadas.
+        Con `lock` bloquea además todos sus tableros en orden de id (ver
+        lock_boards): las operaciones de un lote los tocan en cualquier orden.
+        """
+        if task_ids:
+            rows = db.session.query(Task, Column, Board).join(
+                Column, Task.column_id == Column.id
+            ).join(Board).filter(
+                Task.id.in_(task_ids),
+                Board.owned_by(self.user_id)
+            ).all()
+            for task, column, board in rows:
+                self._tasks[task.id] = task
+                self._task_boards[task.id] = board.id
+                self._columns[column.id] = column
+                self._boards[board.id] = board
+        if column_ids:
+            rows = db.session.query(Column, Board).join(Board).filter(
+                Column.id.in_(column_ids),
+                Board.owned_by(self.user_id)
+            ).all()
+            for column, board in rows:
+                self._columns[column.id] = column
+                self._boards[board.id] = board
+        if board_ids:
+            for board in Board.query.filter(Board.id.in_(board_ids), Board.owned_by(self.user_id)):
+                self._boards[board.id] = board
+        if lock:
+            self.lock_boards(self._boards)
+
+    def board(self, board_id):
+        board = self._boards.get(board_id)
+        if board is None:
+            board = Board.query.filter(Board.id == board_id, Board.owned_by(self.user_id)).first()
+            if board is None:
+                raise OperationError("Board not found", 404)
+            self._boards[board.id] = board
+        return board
+
+    def column(self, column_id):
+        column = self._columns.get(column_id)
+        if column is None:
+            row = db.session.query(Column, Board).join(Board).filter(
+                Column.id == column_id,
+                Board.owned_by(self.user_id)
+            ).first()
+            if row is None:
+                raise OperationError("Column not found", 404)
+            column, board = row
+            self._columns[column.id] = column
+            self._boards[board.id] = board
+        return column
+
+    def task(self, task_id):
+        task = self._tasks.get(task_id)
+        if task is None:
+            row = db.session.query(Task, Board).join(Column, Task.column_id == Column.id).join(Board).filter(
+                Task.id == task_id,
+                Board.owned_by(self.user_id)
+            ).first()
+            if row is None:
+                raise OperationError("Task not found", 404)
+            task, board = row
+            self._tasks[task.id] = task
+            self._task_boards[task.id] = board.id
+            self._boards[board.id] = board
+        return task
+
+    def task_board_id(self, task):
+        """Id del tablero al que pertenecía la tarea cuando se cargó."""
+        return self._task_boards[task.id]
+
+    def task_moved(self, task, board_id):
+        """Registra el nuevo tablero de una tarea movida."""
+        self._task_boards[task.id] = board_id
+
+    def lock_boards(self, board_ids):
+        """
+        Bloquea hasta el final de la transacción las filas de los tableros
+        indicados que aún no lo estén, en orden de id, con el mismo bloqueo que
+        tomará el UPDATE de la versión en commit().
+        """
+        pending = sorted(set(board_ids) - self._locked.keys())
+        if pending:
+            self._locked.update(db.session.execute(
+                db.select(Board.id, Board.version).where(Board.id.in_(pending)).order_by(
+                    Board.id
+                ).with_for_update(key_share=True)
+            ).all())
+
+    def touch(self, *board_ids):
+        """
+        Marca tableros como modificados, comprobando antes If-Match si se indicó.
+
+        Bloquea sus filas, así que las operaciones deben llamarlo antes de
+        bloquear columnas (lock_columns) o escribir: todas toman los bloqueos
+        en el mismo orden, primero los tableros y después sus columnas, y dos
+        escrituras sobre el mismo tablero no se interbloquean. Además nadie
+        cambia la versión entre la comprobación de If-Match y el commit.
+        """
+        self.lock_boards(board_ids)
+        for board_id in sorted(set(board_ids) - self.touched):
+            version = self._locked.get(board_id)
+            if self.if_match is not None and not self.if_match.contains(board_etag(board_id, version)):
+                raise OperationError("Board has been modified", 412)
+            self.touched.add(board_id)
+
+    def count(self, boards=0, columns=0, tasks=0):
+        """Acumula cambios en los contadores del usuario; se aplican en commit()."""
+        self.counts["boards"] += boards
+        self.counts["columns"] += columns
+        self.counts["tasks"] += tasks
+
+    def emit(self, board_id, event_type, **data):
+        """Registra un evento del feed de cambios del tablero; se publica en commit()."""
+        self.events.append(dict(data, type=event_type, board_id=board_id))
+
+    def after_commit(self, callback):
+        """Registra una función que commit() llamará tras confirmar la transacción."""
+        if callback not in self.callbacks:
+            self.callbacks.append(callback)
+
+    @contextmanager
+    def nested(self):
+        """
+        Savepoint para una operación: si falla, se descartan también sus
+        contadores, eventos y tableros tocados (commit() no incrementa su
+        versión), los cambios de tablero de sus tareas y los bloqueos que tomó
+        (volver al savepoint los libera).
+        """
+        counts = dict(self.counts)
+        locked = dict(self._locked)
+        touched = set(self.touched)
+        created = set(self.created)
+        task_boards = dict(self._task_boards)
+        events_count = len(self.events)
+        callbacks_count = len(self.callbacks)
+        try:
+            with db.session.begin_nested():
+                yield
+        except Exception:
+            self.counts = counts
+            self._locked = locked
+            self.touched = touched
+            self.created = created
+            self._task_boards = task_boards
+            del self.events[events_count:]
+            del self.callbacks[callbacks_count:]
+            raise
+
+    def commit(self):
+        """
+        Incrementa la versión de los tableros modificados, confirma y publica
+        los eventos. Devuelve {board_id: nueva versión} de los tableros que
+        siguen existiendo. Lanza OperationError (503) sin confirmar si la
+        transacción modificó tableros existentes durante más de
+        MAX_WRITE_DURATION.
+        """
+        bump_board_versions(self.touched)
+        stamp_created_boards(self.created)
+        adjust_user_stats(self.user_id, **self.counts, changed=bool(self.touched or self.created))
+        if self.touched - self.created and datetime.utcnow() - self.started > MAX_WRITE_DURATION:
+            raise OperationError("The write took too long and was not applied; retry it", 503)
+        versions = {
+            board_id: self._boards[board_id].version
+            for board_id in self.touched
+            if board_id in self._boards
+        }
+        events = [dict(event, version=versions.get(event["board_id"])) for event in self.events]
+        broker = get_event_broker() if events else None
+        if broker is not None:
+            broker.stage(events)
+        db.session.commit()
+        get_board_cache().invalidate(self.touched)
+        if broker is not None:
+            broker.publish(events)
+        for callback in self.callbacks:
+            callback()
+        return versions
+
+    def forget(self, entity):
+        """Olvida una entidad eliminada para que las operaciones siguientes no la encuentren."""
+        cache = {Board: self._boards, Column: self._columns, Task: self._tasks}[type(entity)]
+        cache.pop(entity.id, None)
+
+def _required_name(params, key, label):
+    value = params.get(key) or ""
+    if not isinstance(value, str) or not value.strip():
+        raise OperationError(f"{label} is required")
+    return value.strip()
+
+def log_deletion(user_id, entity_type, entity_id):
+    """
+    Registra un tombstone para la sincronización incremental. Solo se registra
+    la entidad eliminada explícitamente: el cliente elimina en cascada sus hijos.
+    """
+    db.session.add(DeletionLog(entity_type=entity_type, entity_id=entity_id, user_id=user_id))
+
+def lock_columns(column_ids):
+    """
+    Bloquea las filas de las columnas indicadas hasta el final de la transacción.
+    Se bloquean en orden de id para que dos movimientos no se interbloqueen, y
+    siempre después de sus tableros (ver OwnerScope.touch).
+    """
+    db.session.query(Column.id).filter(
+        Column.id.in_(column_ids)
+    ).order_by(Column.id).with_for_update().all()
+
+def _shift_tasks(column_id, delta, *criteria):
+    """Desplaza en `delta` la posición de las tareas indicadas con una sola sentencia UPDATE."""
+    Task.query.filter(Task.column_id == column_id, *criteria).update({
+        Task.position: Task.position + delta,
+        Task.updated_at: datetime.utcnow()
+    }, synchronize_session=False)
+
+def _move_task_by_rank(task, new_column_id, new_position):
+    """Asigna a la tarea una clave entre las de las tareas que quedarán a su alrededor."""
+    siblings = db.session.query(Task.rank).filter(
+        Task.column_id == new_column_id,
+        Task.id != task.id
+    ).order_by(*task_order())
+
+    if new_position <= 0:
+        before_rank = None
+        after_rank = siblings.limit(1).scalar()
+    else:
+        window = [row.rank for row in siblings.offset(new_position - 1).limit(2)]
+        if window:
+            before_rank = window[0]
+            after_rank = window[1] if len(window) > 1 else None
+        else:
+            # Posición más allá del final: se añade tras la última tarea
+            before_rank = db.session.query(db.func.max(Task.rank)).filter(
+                Task.column_id == new_column_id,
+                Task.id != task.id
+            ).scalar()
+            after_rank = None
+
+    task.rank = rank_between(before_rank, after_rank)
+    task.position = None
+
+    # Claves demasiado largas o duplicadas (movimientos concurrentes): reequilibrar
+    collided = before_rank is not None and after_rank is not None and before_rank >= after_rank
+    if len(task.rank) > MAX_RANK_LENGTH or collided:
+        task.column_id = new_column_id
+        db.session.flush()
+        normalize_column_tasks(new_column_id)
+
+def _rank_after_last(last_rank, normalize):
+    """
+    Clave para añadir un elemento al final. `last_rank` devuelve la mayor
+    clave actual; si la nueva superaría MAX_RANK_LENGTH, se reequilibran antes
+    las claves con `normalize` y se recalcula.
+    """
+    new_rank = rank_between(last_rank(), None)
+    if len(new_rank) > MAX_RANK_LENGTH:
+        normalize()
+        new_rank = rank_between(last_rank(), None)
+    return new_rank
+
+def _parse_orders(orders, current_ids):
+    """
+    Valida un reordenamiento completo: debe incluir exactamente los elementos
+    actuales, cada uno una sola vez y con posiciones enteras distintas.
+    Devuelve {id: posición} o lanza OperationError.
+    """
+    if not isinstance(orders, list):
+        raise OperationError("orders must be a list")
+
+    positions = {}
+    for order_data in orders:
+        if not isinstance(order_data, dict):
+            raise OperationError("Each order must have an id and a position")
+        item_id = order_data.get("id")
+        position = order_data.get("position")
+        if not isinstance(item_id, int) or not isinstance(position, int) or position < 0:
+            raise OperationError("Each order must have an integer id and a non-negative integer position")
+        if item_id in positions:
+            raise OperationError(f"Duplicate id {item_id}")
+        positions[item_id] = position
+
+    if len(set(positions.values())) != len(positions):
+        raise OperationError("Positions must be unique")
+    if set(positions) != set(current_ids):
+        raise OperationError("Orders must include exactly the current items")
+    return positions
+
+def _bulk_reorder(model, parent_criterion, positions):
+    """Aplica las nuevas posiciones (y rangos, en el modo "rank") con una sola sentencia UPDATE."""
+    if not positions:
+        return
+
+    values = {
+        model.position: db.case(positions, value=model.id),
+        model.updated_at: datetime.utcnow()
+    }
+    if rank_mode_enabled():
+        # En el modo "rank" las claves se reparten siguiendo las nuevas posiciones
+        ordered = sorted(positions, key=positions.get)
+        values[model.rank] = db.case(dict(zip(ordered, initial_ranks(len(ordered)))), value=model.id)
+
+    model.query.filter(parent_criterion).update(values, synchronize_session=False)
+
+# --- Tableros ---
+
+def create_board(scope, params):
+    name = _required_name(params, "name", "Board name")
+
+    new_board = Board(name=name, user_id=scope.user_id)
+    db.session.add(new_board)
+    db.session.flush()
+    scope.created.add(new_board.id)
+    scope.count(boards=1)
+
+    return {
+        "id": new_board.id,
+        "name": new_board.name,
+        "created_at": new_board.created_at.isoformat() if new_board.created_at else None
+    }, 201
+
+def clone_board(scope, params):
+    """
+    Copia un tablero con sus columnas y tareas dentro de la base de datos:
+    las columnas se insertan devolviendo sus nuevos ids y las tareas con un
+    solo INSERT ... SELECT que traduce column_id con un CASE. Con
+    "as_template" la copia se guarda como plantilla.
+    """
+    source = scope.board(params.get("board_id"))
+    if params.get("name") is None:
+        name = f"{source.name} (copy)"[:200]
+    else:
+        name = _required_name(params, "name", "Board name")
+    as_template = params.get("as_template", False)
+    if not isinstance(as_template, bool):
+        raise OperationError("as_template must be a boolean")
+
+    now = datetime.utcnow()
+    new_board = Board(name=name, description=source.description, user_id=scope.user_id, is_template=as_template)
+    db.session.add(new_board)
+    db.session.flush()
+    scope.created.add(new_board.id)
+
+    columns = db.session.execute(
+        db.select(Column.id, Column.name, Column.position, Column.rank).where(
+            Column.board_id == source.id
+        ).order_by(Column.id)
+    ).all()
+    tasks_count = 0
+    if columns:
+        new_ids = db.session.execute(
+            db.insert(Column).returning(Column.id, sort_by_parameter_order=True),
+            [
+                {"name": c.name, "position": c.position, "rank": c.rank, "board_id": new_board.id,
+                 "created_at": now, "updated_at": now}
+                for c in columns
+            ]
+        ).scalars().all()
+        column_ids = {c.id: new_id for c, new_id in zip(columns, new_ids)}
+
+        # El documento de búsqueda se copia tal cual: el texto es el mismo
+        tasks = db.select(
+            Task.title, Task.description, Task.position, Task.rank, Task.search_vector,
+            db.case(column_ids, value=Task.column_id), db.literal(now, db.DateTime), db.literal(now, db.DateTime)
+        ).where(Task.column_id.in_(column_ids.keys()))
+        tasks_count = db.session.execute(db.insert(Task.__table__).from_select([
+            "title", "description", "position", "rank", "search_vector", "column_id", "created_at", "updated_at"
+        ], tasks)).rowcount
+    scope.count(boards=1, columns=len(columns), tasks=tasks_count)
+
+    return {
+        "id": new_board.id,
+        "name": new_board.name,
+        "is_template": new_board.is_template,
+        "columns_count": len(columns),
+        "tasks_count": tasks_count,
+        "created_at": new_board.created_at.isoformat() if new_board.created_at else None
+    }, 201
+
+def update_board(scope, params):
+    board = scope.board(params.get("board_id"))
+    name = _required_name(params, "name", "Board name")
+
+    scope.touch(board.id)
+    board.name = name
+    board.updated_at = datetime.utcnow()
+    scope.emit(board.id, "board.updated", name=name)
+
+    return {
+        "id": board.id,
+        "name": board.name,
+        "message": "Board updated successfully"
+    }, 200
+
+def delete_board(scope, params):
+    board = scope.board(params.get("board_id"))
+
+    scope.touch(board.id)
+    columns_count, tasks_count = count_board_contents(board.id)
+    scope.count(boards=-1, columns=-columns_count, tasks=-tasks_count)
+    log_deletion(scope.user_id, "board", board.id)
+    scope.emit(board.id, "board.deleted")
+    scope.forget(board)
+    if soft_delete_enabled(tasks_count):
+        # Se oculta ya y sus filas se borran por lotes después del commit (ver app/purge.py)
+        board.deleted_at = datetime.utcnow()
+        scope.after_commit(schedule_purge)
+        return {"message": "Board deleted successfully"}, 202
+    # Columnas y tareas las borra la base de datos en cascada
+    db.session.delete(board)
+    return {"message": "Board deleted successfully"}, 200
+
+# --- Columnas ---
+
+def create_column(scope, params):
+    board = scope.board(params.get("board_id"))
+    name = _required_name(params, "name", "Column name")
+    # touch() bloquea el tablero: dos inserciones concurrentes no
+    # obtienen la misma posición
+    scope.touch(board.id)
+
+    # Obtener la posición de la nueva columna (al final)
+    new_position = db.session.query(
+        db.func.coalesce(db.func.max(Column.position), -1) + 1
+    ).filter_by(board_id=board.id).scalar()
+
+    new_column = Column(name=name, board_id=board.id, position=new_position)
+    if rank_mode_enabled():
+        new_column.rank = _rank_after_last(
+            lambda: db.session.query(db.func.max(Column.rank)).filter_by(board_id=board.id).scalar(),
+            lambda: normalize_board_columns(board.id)
+        )
+    db.session.add(new_column)
+    db.session.flush()
+    scope.count(columns=1)
+    scope.emit(board.id, "column.created", column={
+        "id": new_column.id, "name": new_column.name, "position": new_column.position
+    })
+
+    return {
+        "id": new_column.id,
+        "name": new_column.name,
+        "position": new_column.position,
+        "board_id": new_column.board_id
+    }, 201
+
+def update_column(scope, params):
+    column = scope.column(params.get("column_id"))
+    name = _required_name(params, "name", "Column name")
+
+    scope.touch(column.board_id)
+    column.name = name
+    scope.emit(column.board_id, "column.updated", column={"id": column.id, "name": name})
+
+    return {
+        "id": column.id,
+        "name": column.name,
+        "message": "Column updated successfully"
+    }, 200
+
+def delete_column(scope, params):
+    column = scope.column(params.get("column_id"))
+
+    scope.touch(column.board_id)
+    scope.count(columns=-1, tasks=-count_column_tasks(column.id))
+    log_deletion(scope.user_id, "column", column.id)
+    scope.emit(column.board_id, "column.deleted", column_id=column.id)
+    db.session.delete(column)
+    scope.forget(column)
+    return {"message": "Column deleted successfully"}, 200
+
+def archive_column(scope, params):
+    """Archiva todas las tareas de la columna y la elimina (ver app/archive.py)."""
+    column = scope.column(params.get("column_id"))
+
+    scope.touch(column.board_id)
+    # El tombstone de la columna basta: el cliente elimina en cascada sus tareas
+    archived = archive_tasks(Task.column_id == column.id)
+    scope.count(columns=-1, tasks=-archived)
+    log_deletion(scope.user_id, "column", column.id)
+    scope.emit(column.board_id, "column.archived", column_id=column.id)
+    db.session.delete(column)
+    scope.forget(column)
+    return {"message": "Column archived successfully", "archived_tasks": archived}, 200
+
+def reorder_columns(scope, params):
+    board = scope.board(params.get("board_id"))
+    # touch() bloquea el tablero mientras se valida y aplica el nuevo orden
+    scope.touch(board.id)
+
+    current_ids = db.session.execute(
+        db.select(Column.id).where(Column.board_id == board.id)
+    ).scalars().all()
+    positions = _parse_orders(params.get("column_orders", []), current_ids)
+
+    _bulk_reorder(Column, Column.board_id == board.id, positions)
+    scope.emit(board.id, "columns.reordered", column_ids=sorted(positions, key=positions.get))
+    return {"message": "Columns reordered successfully"}, 200
+
+def reorder_tasks(scope, params):
+    column = scope.column(params.get("column_id"))
+    scope.touch(column.board_id)
+
+    # Bloquear la columna para que no se inserten ni muevan tareas mientras tanto
+    lock_columns({column.id})
+
+    current_ids = db.session.execute(
+        db.select(Task.id).where(Task.column_id == column.id)
+    ).scalars().all()
+    positions = _parse_orders(params.get("task_orders", []), current_ids)
+
+    _bulk_reorder(Task, Task.column_id == column.id, positions)
+    scope.emit(column.board_id, "tasks.reordered", column_id=column.id, task_ids=sorted(positions, key=positions.get))
+    return {"message": "Tasks reordered successfully"}, 200
+
+# --- Tareas ---
+
+def create_task(scope, params):
+    column = scope.column(params.get("column_id"))
+    title = _required_name(params, "title", "Task title")
+    scope.touch(column.board_id)
+
+    new_rank = None
+    if rank_mode_enabled():
+        # La tarea se añade tras la última clave; la posición es solo informativa
+        new_rank = _rank_after_last(
+            lambda: db.session.query(db.func.max(Task.rank)).filter_by(column_id=column.id).scalar(),
+            lambda: normalize_column_tasks(column.id)
+        )
+        new_position = Task.query.filter_by(column_id=column.id).count()
+    else:
+        # Bloquear la columna para que las inserciones y movimientos
+        # concurrentes no obtengan la misma posición
+        lock_columns({column.id})
+
+        # Obtener la posición de la nueva tarea (al final)
+        new_position = db.session.query(
+            db.func.coalesce(db.func.max(Task.position), -1) + 1
+        ).filter_by(column_id=column.id).scalar()
+
+    description = params.get("description", "")
+    new_task = Task(
+        title=title,
+        description=description,
+        position=None if new_rank else new_position,
+        rank=new_rank,
+        search_vector=search_document(title, description),
+        column_id=column.id
+    )
+    db.session.add(new_task)
+    db.session.flush()
+    scope.count(tasks=1)
+    scope.emit(column.board_id, "task.created", task={
+        "id": new_task.id,
+        "title": new_task.title,
+        "description": new_task.description,
+        "column_id": new_task.column_id,
+        "position": new_position
+    })
+
+    return {
+        "id": new_task.id,
+        "title": new_task.title,
+        "description": new_task.description,
+        "position": new_position,
+        "column_id": new_task.column_id,
+        "created_at": new_task.created_at.isoformat() if new_task.created_at else None
+    }, 201
+
+def update_task(scope, params):
+    task = scope.task(params.get("task_id"))
+    title = _required_name(params, "title", "Task title")
+
+    scope.touch(scope.task_board_id(task))
+    task.title = title
+    task.description = params.get("description", "")
+    task.search_vector = search_document(task.title, task.description)
+    task.updated_at = datetime.utcnow()
+    scope.emit(scope.task_board_id(task), "task.updated", task={
+        "id": task.id, "title": task.title, "description": task.description
+    })
+
+    return {
+        "id": task.id,
+        "title": task.title,
+        "description": task.description,
+        "message": "Task updated successfully"
+    }, 200
+
+def delete_task(scope, params):
+    task = scope.task(params.get("task_id"))
+
+    scope.touch(scope.task_board_id(task))
+    scope.count(tasks=-1)
+    log_deletion(scope.user_id, "task", task.id)
+    scope.emit(scope.task_board_id(task), "task.deleted", task_id=task.id, column_id=task.column_id)
+    db.session.delete(task)
+    scope.forget(task)
+    return {"message": "Task deleted successfully"}, 200
+
+def archive_task(scope, params):
+    task = scope.task(params.get("task_id"))
+    board_id = scope.task_board_id(task)
+
+    scope.touch(board_id)
+    archive_tasks(Task.id == task.id, user_id=scope.user_id)
+    scope.count(tasks=-1)
+    scope.emit(board_id, "task.archived", task_id=task.id, column_id=task.column_id)
+    scope.forget(task)
+    return {"message": "Task archived successfully"}, 200
+
+def move_task(scope, params):
+    task = scope.task(params.get("task_id"))
+    new_column_id = params.get("new_column_id")
+    new_position = params.get("new_position")
+
+    if new_column_id is None or new_position is None:
+        raise OperationError("new_column_id and new_position are required")
+    if not isinstance(new_column_id, int) or not isinstance(new_position, int):
+        raise OperationError("new_column_id and new_position must be integers")
+
+    # Verificar que la nueva columna pertenezca al mismo usuario
+    new_column = scope.column(new_column_id)
+    # Los dos tableros a la vez, para bloquearlos en orden de id
+    scope.touch(scope.task_board_id(task), new_column.board_id)
+
+    if not rank_mode_enabled():
+        # Serializar los movimientos e inserciones sobre las columnas
+        # afectadas y releer la posición ya con el bloqueo tomado
+        locked = {task.column_id, new_column_id}
+        lock_columns(locked)
+        db.session.refresh(task)
+        if task.column_id not in locked:
+            # La tarea cambió de columna mientras esperábamos el bloqueo. Si
+            # sigue en un tablero bloqueado por touch(), nadie más puede tener
+            # bloqueada su columna y se bloquea sin riesgo; si pasó a otro
+            # tablero habría que bloquearlo fuera de orden, así que se rechaza
+            board_id = db.session.query(Column.board_id).filter(Column.id == task.column_id).scalar()
+            if board_id not in scope.touched:
+                raise OperationError("Task was moved by another request", 409)
+            lock_columns({task.column_id})
+
+        # Ajustar la posición al rango actual de la columna destino: el cliente
+        # la eligió antes de que otros movimientos cambiaran su número de tareas
+        last_position = db.session.query(db.func.count(Task.id)).filter(
+            Task.column_id == new_column_id, Task.id != task.id
+        ).scalar()
+        new_position = min(max(new_position, 0), last_position)
+
+    old_column_id = task.column_id
+    old_position = task.position
+
+    if rank_mode_enabled():
+        # Solo se actualiza la fila movida: la nueva clave queda entre sus vecinos
+        _move_task_by_rank(task, new_column_id, new_position)
+    # Si se mueve dentro de la misma columna, reordenar las tareas
+    elif old_column_id == new_column_id:
+        if new_position < old_position:
+            # Mover hacia arriba: incrementar posición de tareas entre new_position y old_position-1
+            _shift_tasks(old_column_id, 1, Task.position >= new_position, Task.position < old_position)
+        else:
+            # Mover hacia abajo: decrementar posición de tareas entre old_position+1 y new_position
+            _shift_tasks(old_column_id, -1, Task.position > old_position, Task.position <= new_position)
+    else:
+        # Movimiento entre columnas diferentes: cerrar el hueco en la columna
+        # antigua y abrir uno en la nueva
+        _shift_tasks(old_column_id, -1, Task.position > old_position)
+        _shift_tasks(new_column_id, 1, Task.position >= new_position)
+
+    # Actualizar la tarea movida
+    task.column_id = new_column_id
+    if not rank_mode_enabled():
+        task.position = new_position
+    task.updated_at = datetime.utcnow()
+    old_board_id = scope.task_board_id(task)
+    scope.task_moved(task, new_column.board_id)
+    # Las operaciones siguientes de un lote deben ver la nueva posición
+    db.session.flush()
+    # Al cambiar de tablero, los suscriptores de ambos deben enterarse
+    for board_id in {old_board_id, new_column.board_id}:
+        scope.emit(board_id, "task.moved", task_id=task.id, from_column_id=old_column_id,
+                   column_id=new_column_id, position=new_position)
+
+    return {
+        "message": "Task moved successfully",
+        "task": {
+            "id": task.id,
+            "title": task.title,
+            "column_id": task.column_id,
+            "position": new_position
+        }
+    }, 200
+
+# Operaciones disponibles por nombre, tanto para las rutas como para los lotes
+OPERATIONS = {
+    "create_board": create_board,
+    "update_board": update_board,
+    "delete_board": delete_board,
+    "clone_board": clone_board,
+    "create_column": create_column,
+    "update_column": update_column,
+    "delete_column": delete_column,
+    "archive_column": archive_column,
+    "reorder_columns": reorder_columns,
+    "reorder_tasks": reorder_tasks,
+    "create_task": create_task,
+    "update_task": update_task,
+    "delete_task": delete_task,
+    "archive_task": archive_task,
+    "move_task": move_task,
+}
@@ -0,0 +1,124 @@
+"""
+Eliminación diferida de tableros grandes.
+
+Con ON DELETE CASCADE borrar un tablero es una sola sentencia, pero con
+decenas de miles de tareas esa sentencia sigue tardando y mantiene los
+bloqueos hasta el commit. Por eso los tableros con al menos
+SOFT_DELETE_MIN_TASKS tareas (0, el valor por defecto, lo desactiva) solo se
+marcan con Board.deleted_at, lo que basta para que desaparezcan de todas las
+consultas (ver Board.owned_by), y la petición responde enseguida. Sus filas
+se borran después por lotes de PURGE_BATCH_SIZE tareas, cada uno en su
+propia transacción.
+
+La purga arranca en un hilo del proceso que eliminó el tablero. Si el
+proceso termina antes, `flask purge-deleted-boards` (por ejemplo desde cron)
+completa los tableros pendientes: la purga se puede interrumpir y reanudar
+en cualquier punto.
+"""
+import logging
+import threading
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+from .db import db
+from .models import ArchivedTask, Board, Column, Task
+
+logger = logging.getLogger(__name__)
+
+def soft_delete_enabled(tasks_count):
+    """Indica si un tablero con `tasks_count` tareas debe eliminarse de forma diferida."""
+    threshold = current_app.config.get("SOFT_DELETE_MIN_TASKS", 0)
+    return bool(threshold) and tasks_count >= threshold
+
+def _delete_in_batches(model, criterion, batch_size):
+    """Borra las filas que cumplen `criterion` en lotes de `batch_size`, confirmando cada uno."""
+    deleted = 0
+    while True:
+        batch = db.select(model.id).where(criterion).limit(batch_size)
+        count = db.session.execute(
+            db.delete(model).where(model.id.in_(batch)).execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        deleted += count
+        if count < batch_size:
+            return deleted
+
+def purge_board(board_id, batch_size):
+    """
+    Borra por lotes las tareas (también las archivadas) de un tablero marcado
+    como eliminado y después el tablero (sus columnas caen en cascada).
+    Confirma cada lote. Devuelve el número de tareas borradas.
+    """
+    column_ids = db.select(Column.id).where(Column.board_id == board_id)
+    deleted = _delete_in_batches(Task, Task.column_id.in_(column_ids), batch_size)
+    deleted += _delete_in_batches(ArchivedTask, ArchivedTask.board_id == board_id, batch_size)
+    db.session.execute(
+        db.delete(Board).where(Board.id == board_id, Board.deleted_at.isnot(None)).execution_options(
+            synchronize_session=False
+        )
+    )
+    db.session.commit()
+    return deleted
+
+def purge_deleted_boards(batch_size=None):
+    """Purga todos los tableros pendientes, el más antiguo primero. Devuelve (tableros, tareas)."""
+    batch_size = batch_size or current_app.config.get("PURGE_BATCH_SIZE", 1000)
+    boards = tasks = 0
+    while True:
+        # Se consulta de nuevo en cada vuelta para recoger los eliminados mientras tanto
+        board_id = db.session.execute(
+            db.select(Board.id).where(Board.deleted_at.isnot(None)).order_by(Board.deleted_at, Board.id).limit(1)
+        ).scalar()
+        if board_id is None:
+            return boards, tasks
+        tasks += purge_board(board_id, batch_size)
+        boards += 1
+        logger.info("Purged board %s", board_id, extra={"purged_tasks": tasks})
+
+class PurgeThread:
+    """Ejecuta purge_deleted_boards() en un hilo del proceso, una sola vez a la vez."""
+
+    def __init__(self, app):
+        self.app = app
+        self._lock = threading.Lock()
+        self._running = False
+        self._requested = False
+
+    def request(self):
+        with self._lock:
+            self._requested = True
+            if self._running:
+                # El hilo en curso volverá a buscar tableros pendientes al terminar
+                return
+            self._running = True
+        threading.Thread(target=self._run, name="kanban-board-purge", daemon=True).start()
+
+    def _run(self):
+        with self.app.app_context():
+            try:
+                while True:
+                    with self._lock:
+                        if not self._requested:
+                            self._running = False
+                            return
+                        self._requested = False
+                    purge_deleted_boards()
+            except SQLAlchemyError as e:
+                # Los tableros que queden se purgarán en la próxima eliminación o con el comando
+                logger.error("Database error in board purge: %s", e)
+                db.session.rollback()
+                with self._lock:
+                    self._running = False
+            finally:
+                db.session.remove()
+
+_purge_lock = threading.Lock()
+
+def schedule_purge():
+    """Pide al hilo de purga de la aplicación actual que purgue los tableros pendientes."""
+    purge = current_app.extensions.get("board_purge")
+    if purge is None:
+        with _purge_lock:
+            purge = current_app.extensions.get("board_purge")
+            if purge is None:
+                purge = current_app.extensions["board_purge"] = PurgeThread(current_app._get_current_object())
+    purge.request()
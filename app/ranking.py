@@ -0,0 +1,124 @@
+"""
+Ordenación por rangos lexicográficos (estilo LexoRank).
+
+En el modo "rank" cada columna y cada tarea guarda una clave de texto cuyo
+orden lexicográfico define su posición. Mover una tarea solo requiere calcular
+una clave entre sus dos nuevos vecinos, así que se actualiza una única fila en
+lugar de desplazar todas las tareas intermedias.
+
+En el modo "position" (por defecto) se mantienen las posiciones enteras densas.
+Al cambiar de modo hay que ejecutar `flask normalize-ordering`, que reescribe
+posiciones y rangos de todas las columnas.
+"""
+from flask import current_app
+from .db import db
+from .models import Column, Task
+
+# Alfabeto de las claves: solo dígitos y minúsculas para que el orden sea el
+# mismo con cualquier collation de la base de datos.
+RANK_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+RANK_BASE = len(RANK_DIGITS)
+
+# Longitud a partir de la cual se reequilibran las claves de una columna
+MAX_RANK_LENGTH = 24
+
+def rank_mode_enabled():
+    """Indica si la aplicación usa rangos en lugar de posiciones enteras."""
+    return current_app.config.get("ORDERING_MODE") == "rank"
+
+def rank_between(before, after):
+    """
+    Devuelve una clave estrictamente entre `before` y `after`.
+    Cualquiera de las dos puede ser None para indicar el inicio o el final.
+    Las claves generadas nunca terminan en el dígito mínimo, de modo que
+    siempre existe otra clave entre dos claves consecutivas.
+    """
+    # Al añadir al final o al principio se avanza de un dígito en un dígito
+    # en lugar de tomar el punto medio, para que las claves crezcan despacio.
+    appending = after is None
+    prepending = not before
+    before = before or ""
+    result = []
+    i = 0
+    while True:
+        low = RANK_DIGITS.index(before[i]) if i < len(before) else 0
+        high = RANK_DIGITS.index(after[i]) if after is not None and i < len(after) else RANK_BASE
+        if high - low > 1:
+            if appending:
+                digit = low + 1
+            elif prepending:
+                digit = high - 1
+            else:
+                digit = (low + high) // 2
+            result.append(RANK_DIGITS[digit])
+            return "".join(result)
+        result.append(RANK_DIGITS[low])
+        if low < high:
+            # A partir de aquí ya estamos por debajo de `after`
+            after = None
+        i += 1
+
+def initial_ranks(count):
+    """Genera `count` claves ordenadas y repartidas uniformemente."""
+    width = 1
+    while RANK_BASE ** width <= count + 1:
+        width += 1
+    step = RANK_BASE ** width // (count + 1)
+
+    ranks = []
+    for i in range(1, count + 1):
+        value = i * step
+        digits = []
+        for _ in range(width):
+            value, digit = divmod(value, RANK_BASE)
+            digits.append(RANK_DIGITS[digit])
+        ranks.append("".join(reversed(digits)).rstrip(RANK_DIGITS[0]))
+    return ranks
+
+def task_order(by_rank=None):
+    """Criterio de orden de las tareas dentro de una columna según el modo activo."""
+    if by_rank is None:
+        by_rank = rank_mode_enabled()
+    if by_rank:
+        return (Task.rank, Task.id)
+    return (Task.position, Task.id)
+
+def column_order(by_rank=None):
+    """Criterio de orden de las columnas dentro de un tablero según el modo activo."""
+    if by_rank is None:
+        by_rank = rank_mode_enabled()
+    if by_rank:
+        return (Column.rank, Column.id)
+    return (Column.position, Column.id)
+
+def normalize_column_tasks(column_id, by_rank=None):
+    """
+    Reescribe las tareas de una columna con posiciones densas y rangos
+    uniformes, conservando el orden actual (por rango o por posición según
+    `by_rank`, o según el modo activo). No confirma la transacción.
+    """
+    task_ids = db.session.execute(
+        db.select(Task.id).where(Task.column_id == column_id).order_by(*task_order(by_rank))
+    ).scalars().all()
+    if not task_ids:
+        return 0
+
+    db.session.execute(db.update(Task), [
+        {"id": task_id, "position": position, "rank": rank}
+        for position, (task_id, rank) in enumerate(zip(task_ids, initial_ranks(len(task_ids))))
+    ])
+    return len(task_ids)
+
+def normalize_board_columns(board_id, by_rank=None):
+    """Igual que normalize_column_tasks, pero para las columnas de un tablero."""
+    column_ids = db.session.execute(
+        db.select(Column.id).where(Column.board_id == board_id).order_by(*column_order(by_rank))
+    ).scalars().all()
+    if not column_ids:
+        return 0
+
+    db.session.execute(db.update(Column), [
+        {"id": column_id, "position": position, "rank": rank}
+        for position, (column_id, rank) in enumerate(zip(column_ids, initial_ranks(len(column_ids))))
+    ])
+    return len(column_ids)
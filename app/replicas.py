@@ -0,0 +1,97 @@
+"""
+Lecturas desde réplicas de la base de datos.
+
+DATABASE_REPLICA_URLS (URLs separadas por comas) define un bind por réplica
+en SQLALCHEMY_BINDS: replica_0, replica_1... Las rutas de solo lectura
+marcadas con @replica_reads eligen una réplica por turnos al empezar la
+petición y sus SELECT van a ella (ver RoutingSession en app/db.py). El resto
+de rutas y todas las escrituras usan el primario.
+
+Las réplicas van con retraso respecto al primario. Para que un cliente lea
+lo que acaba de escribir, cada escritura con éxito le deja una cookie con la
+hora, y durante REPLICA_STICKY_SECONDS sus lecturas van al primario. Una ruta
+de lectura que tenga que escribir llama antes a use_primary().
+
+Sin réplicas configuradas todo va al primario. Para probarlo en local basta
+con dos bases de datos SQLite o PostgreSQL (ver bench/replica_check.py).
+"""
+import itertools
+import math
+import threading
+import time
+from functools import wraps
+from flask import current_app, g, request
+
+# Cookie con la hora (epoch) de la última escritura del cliente
+STICKY_COOKIE = "kanban_wrote_at"
+
+def replica_urls(value):
+    """Lista de URLs a partir de DATABASE_REPLICA_URLS."""
+    return [url.strip() for url in (value or "").split(",") if url.strip()]
+
+def replica_binds(urls):
+    """{bind_key: url} para SQLALCHEMY_BINDS."""
+    return {f"replica_{index}": url for index, url in enumerate(urls)}
+
+class ReplicaRouter:
+    """Reparte las lecturas entre las réplicas por turnos."""
+
+    def __init__(self, bind_keys):
+        self.bind_keys = list(bind_keys)
+        self.primary_reads = 0
+        self.replica_reads = dict.fromkeys(self.bind_keys, 0)
+        self._cycle = itertools.cycle(self.bind_keys)
+        self._lock = threading.Lock()
+
+    def choose(self, sticky):
+        """Bind de lectura para una petición, o None para usar el primario."""
+        with self._lock:
+            if sticky or not self.bind_keys:
+                self.primary_reads += 1
+                return None
+            bind_key = next(self._cycle)
+            self.replica_reads[bind_key] += 1
+            return bind_key
+
+    def stats(self):
+        with self._lock:
+            return {"primary_reads": self.primary_reads, "replica_reads": dict(self.replica_reads)}
+
+def recently_wrote():
+    """Indica si el cliente escribió hace menos de REPLICA_STICKY_SECONDS."""
+    try:
+        wrote_at = float(request.cookies.get(STICKY_COOKIE, 0))
+    except ValueError:
+        return False
+    return time.time() - wrote_at < current_app.config.get("REPLICA_STICKY_SECONDS", 5)
+
+def replica_reads(view):
+    """Decorador de las rutas de solo lectura: sus SELECT pueden ir a una réplica."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        router = current_app.extensions.get("read_replicas")
+        if router is not None and router.bind_keys:
+            g.read_bind = router.choose(recently_wrote())
+        return view(*args, **kwargs)
+    return wrapper
+
+def use_primary():
+    """Envía al primario el resto de consultas de la petición (antes de escribir o releer lo escrito)."""
+    g.pop("read_bind", None)
+
+def init_replicas(app):
+    """Crea el reparto de lecturas con los binds replica_* configurados y la cookie de escrituras."""
+    bind_keys = sorted(key for key in app.config.get("SQLALCHEMY_BINDS") or {} if key.startswith("replica_"))
+    router = app.extensions["read_replicas"] = ReplicaRouter(bind_keys)
+    if not router.bind_keys:
+        return
+
+    @app.after_request
+    def remember_write(response):
+        if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+            response.set_cookie(
+                STICKY_COOKIE, repr(time.time()),
+                max_age=math.ceil(app.config.get("REPLICA_STICKY_SECONDS", 5)),
+                httponly=True, samesite="Lax"
+            )
+        return response
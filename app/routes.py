@@ -1,10 +1,38 @@
-from flask import Blueprint, request, jsonify
+import base64
+import hashlib
+import io
+import json
+import logging
+import time
+from datetime import datetime
+from flask import Blueprint, Response, abort, current_app, g, request, jsonify, stream_with_context
+from werkzeug.http import parse_etags
 from sqlalchemy.exc import SQLAlchemyError
-from .models import User, Board, Column, Task
+from .models import User, Board, Column, Task, ArchivedTask, DeletionLog, UserStats
+from .cache import get_board_cache
 from .db import db
+from .events import format_sse, get_event_broker
+from .singleflight import SingleFlight
+from .stats import adjust_user_stats, reconcile_user_stats
+from . import transfer
+from .replicas import replica_reads, use_primary
+from .search import search_tasks
+from .serialization import isoformat, json_response
+from .operations import (
+    MAX_WRITE_DURATION, OPERATIONS, OperationError, OwnerScope, board_etag, stamp_created_boards
+)
+from .ranking import column_order, rank_mode_enabled, task_order
 
 kanban_bp = Blueprint("kanban", __name__)
 
+logger = logging.getLogger(__name__)
+
+# Tamaño máximo de página para los listados paginados
+MAX_PAGE_SIZE = 200
+
+# Cargas de tableros en curso en este worker (ver app/singleflight.py)
+_board_loads = SingleFlight()
+
 # Para simplicidad, usaremos un user_id fijo o el primer usuario
 # En un proyecto real podrías usar sesiones o cookies simples
 def get_current_user():
@@ -30,503 +58,955 @@ def get_current_user():
         
         return user_id
     except Exception as e:
-        print(f"Error getting current user: {e}")
+        logger.error("Error getting current user: %s", e)
         return 1  # Fallback a user_id = 1
 
+def run_operation(name, data=None, **ids):
+    """
+    Ejecuta una operación de app/operations.py con los datos de la petición y
+    los ids de la URL, y confirma la transacción.
+    """
+    user_id = get_current_user()
+    params = dict(data or {}, **ids)
+    # If-Match permite concurrencia optimista con el ETag del tablero
+    scope = OwnerScope(user_id, if_match=request.if_match or None)
+
+    try:
+        body, status = OPERATIONS[name](scope, params)
+        versions = scope.commit()
+        response = jsonify(body)
+        if len(versions) == 1:
+            (board_id, version), = versions.items()
+            response.set_etag(board_etag(board_id, version))
+        return response, status
+    except OperationError as e:
+        db.session.rollback()
+        return jsonify({"message": e.message}), e.status
+    except SQLAlchemyError as e:
+        logger.error("Database error in %s: %s", name, e)
+        db.session.rollback()
+        return jsonify({"message": "Database error occurred"}), 500
+
 # --- Rutas para Tableros ---
 
 @kanban_bp.route("/boards", methods=["POST"])
 def create_board():
-    user_id = get_current_user()
-        
-    try:
-        data = request.get_json()
-        name = data.get("name", "").strip()
+    return run_operation("create_board", request.get_json())
+
+@kanban_bp.route("/boards/<int:board_id>/clone", methods=["POST"])
+def clone_board(board_id):
+    """Copia el tablero (o crea uno a partir de una plantilla): {"name": ..., "as_template": false}."""
+    return run_operation("clone_board", request.get_json(silent=True), board_id=board_id)
 
-        if not name:
-            return jsonify({"message": "Board name is required"}), 400
+def encode_cursor(*values):
+    """Codifica una clave de paginación como un cursor opaco."""
+    raw = json.dumps(values, default=lambda v: v.isoformat(), separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
 
-        new_board = Board(name=name, user_id=user_id)
-        db.session.add(new_board)
+def decode_cursor(cursor):
+    """Decodifica un cursor generado por encode_cursor. Lanza ValueError si es inválido."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+def _user_stats(user_id):
+    """
+    Fila de user_stats del usuario (ver app/stats.py). Si aún no existe se
+    calcula y se escribe en el primario, y se confirma.
+    """
+    stats = db.session.get(UserStats, user_id)
+    if stats is None:
+        use_primary()
+        reconcile_user_stats([user_id])
         db.session.commit()
-        
-        return jsonify({
-            "id": new_board.id, 
-            "name": new_board.name,
-            "created_at": new_board.created_at.isoformat() if hasattr(new_board, 'created_at') else None
-        }), 201
-        
-    except SQLAlchemyError as e:
-        print(f"Database error in create_board: {e}")
-        db.session.rollback()
-        return jsonify({"message": "Database error occurred"}), 500
+        stats = db.session.get(UserStats, user_id)
+    return stats
 
 @kanban_bp.route("/boards", methods=["GET"])
+@replica_reads
 def get_boards():
-    print("=== GET_BOARDS CALLED ===")
     user_id = get_current_user()
-    print(f"Using User ID: {user_id}")
 
     try:
-        boards = Board.query.filter_by(user_id=user_id).order_by(Board.created_at.desc()).all()
-        print(f"Found {len(boards)} boards for user {user_id}")
+        limit = request.args.get("limit", type=int)
+        cursor = request.args.get("cursor")
+        if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+            return jsonify({"message": f"limit must be between 1 and {MAX_PAGE_SIZE}"}), 400
+
+        # ETag del listado a partir de boards_version, una búsqueda por clave
+        # primaria: crear, borrar o modificar cualquier tablero (o su contenido) lo cambia
+        boards_version = _user_stats(user_id).boards_version
+        etag = hashlib.md5(f"{user_id}:{boards_version}:{limit}:{cursor}".encode()).hexdigest()
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+
+        # Primero la página de tableros, paginada por clave (created_at, id) en
+        # orden descendente, para que el coste no dependa del tamaño de la cuenta
+        page = db.select(Board.id, Board.name, Board.created_at).where(
+            Board.owned_by(user_id), Board.is_template.is_(False)
+        )
+        if cursor:
+            try:
+                created_at, board_id = decode_cursor(cursor)
+                created_at = datetime.fromisoformat(created_at)
+                board_id = int(board_id)
+            except (ValueError, TypeError):
+                return jsonify({"message": "Invalid cursor"}), 400
+            page = page.where(db.or_(
+                Board.created_at < created_at,
+                db.and_(Board.created_at == created_at, Board.id < board_id)
+            ))
+        page = page.order_by(Board.created_at.desc(), Board.id.desc())
+        if limit is not None:
+            page = page.limit(limit + 1)
+        page = page.subquery()
+
+        # Después, en la misma consulta, columnas y tareas contadas solo para esos tableros
+        rows = db.session.execute(
+            db.select(
+                page.c.id,
+                page.c.name,
+                page.c.created_at,
+                db.func.count(db.distinct(Column.id)).label("columns_count"),
+                db.func.count(Task.id).label("tasks_count")
+            ).outerjoin(Column, Column.board_id == page.c.id).outerjoin(
+                Task, Task.column_id == Column.id
+            ).group_by(page.c.id, page.c.name, page.c.created_at).order_by(
+                page.c.created_at.desc(), page.c.id.desc()
+            )
+        ).all()
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+        logger.debug("Found %d boards for user %s", len(rows), user_id)
         
         boards_list = [
             {
                 "id": b.id, 
                 "name": b.name,
-                "created_at": b.created_at.isoformat() if hasattr(b, 'created_at') else None,
-                "columns_count": len(b.columns)
-            } for b in boards
+                "created_at": b.created_at.isoformat() if b.created_at else None,
+                "columns_count": b.columns_count,
+                "tasks_count": b.tasks_count
+            } for b in rows
         ]
-        print("=== GET_BOARDS SUCCESS ===")
-        return jsonify(boards_list)
+        response = jsonify(boards_list)
+        response.set_etag(etag)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return response
     except SQLAlchemyError as e:
-        print(f"Database error in get_boards: {e}")
+        logger.error("Database error in get_boards: %s", e)
+        db.session.rollback()
         return jsonify({"message": "Database error occurred"}), 500
 
+@kanban_bp.route("/templates", methods=["GET"])
+@replica_reads
+def get_templates():
+    """Plantillas del usuario; se usan con POST /boards/<id>/clone."""
+    user_id = get_current_user()
+
+    try:
+        rows = db.session.query(
+            Board.id,
+            Board.name,
+            Board.created_at,
+            db.func.count(db.distinct(Column.id)).label("columns_count"),
+            db.func.count(Task.id).label("tasks_count")
+        ).outerjoin(Column, Column.board_id == Board.id).outerjoin(
+            Task, Task.column_id == Column.id
+        ).filter(Board.owned_by(user_id), Board.is_template.is_(True)).group_by(Board.id).order_by(
+            Board.name, Board.id
+        ).all()
+
+        return jsonify([
+            {
+                "id": b.id,
+                "name": b.name,
+                "created_at": isoformat(b.created_at),
+                "columns_count": b.columns_count,
+                "tasks_count": b.tasks_count
+            } for b in rows
+        ])
+    except SQLAlchemyError as e:
+        logger.error("Database error in get_templates: %s", e)
+        return jsonify({"message": "Database error occurred"}), 500
+
+def _load_boards_columns(board_ids):
+    """
+    Carga columnas y tareas de varios tableros con un número fijo de consultas:
+    una para las columnas y otra para todas sus tareas, ya ordenadas en SQL.
+    Se leen solo los campos necesarios como filas, sin crear objetos del ORM,
+    y la estructura se arma en una sola pasada. Devuelve {board_id: columnas}.
+    En el modo "rank" la posición devuelta es el índice dentro de la lista.
+    """
+    by_rank = rank_mode_enabled()
+    boards_columns = {board_id: [] for board_id in board_ids}
+    if not boards_columns:
+        return boards_columns
+
+    tasks_by_column = {}
+    for column_id, board_id, name, position in db.session.execute(
+        db.select(Column.id, Column.board_id, Column.name, Column.position).where(
+            Column.board_id.in_(boards_columns.keys())
+        ).order_by(Column.board_id, *column_order())
+    ):
+        columns = boards_columns[board_id]
+        tasks_by_column[column_id] = []
+        columns.append({
+            "id": column_id,
+            "name": name,
+            "position": len(columns) if by_rank else position,
+            "tasks": tasks_by_column[column_id]
+        })
+    if not tasks_by_column:
+        return boards_columns
+
+    for task_id, column_id, title, description, position, created_at, updated_at in db.session.execute(
+        db.select(
+            Task.id, Task.column_id, Task.title, Task.description,
+            Task.position, Task.created_at, Task.updated_at
+        ).where(Task.column_id.in_(tasks_by_column.keys())).order_by(Task.column_id, *task_order())
+    ):
+        column_tasks = tasks_by_column[column_id]
+        column_tasks.append({
+            "id": task_id,
+            "title": title,
+            "description": description,
+            "position": len(column_tasks) if by_rank else position,
+            "created_at": isoformat(created_at),
+            "updated_at": isoformat(updated_at)
+        })
+    return boards_columns
+
+def _cached_board_columns(board_id, version):
+    """
+    Columnas serializadas del tablero, servidas desde la caché si la versión
+    coincide. Las peticiones concurrentes del mismo tablero y versión dentro
+    del worker comparten una sola carga.
+    """
+    cache = get_board_cache()
+    columns_data = cache.get(board_id, version)
+    if columns_data is None:
+
+        def load():
+            loaded = _load_boards_columns([board_id])[board_id]
+            cache.set(board_id, version, loaded)
+            return loaded
+
+        columns_data = _board_loads.do((board_id, version), load)
+    return columns_data
+
+def _cached_boards_columns(versions):
+    """
+    Como _cached_board_columns() para varios tableros ({board_id: versión}):
+    los que no están en la caché se cargan juntos con _load_boards_columns().
+    """
+    cache = get_board_cache()
+    result = {board_id: cache.get(board_id, version) for board_id, version in versions.items()}
+    missing = [board_id for board_id, columns_data in result.items() if columns_data is None]
+    if missing:
+        for board_id, columns_data in _load_boards_columns(missing).items():
+            cache.set(board_id, versions[board_id], columns_data)
+            result[board_id] = columns_data
+    return result
+
 @kanban_bp.route("/boards/<int:board_id>", methods=["GET"])
+@replica_reads
 def get_board(board_id):
     user_id = get_current_user()
     
     try:
-        board = Board.query.filter_by(id=board_id, user_id=user_id).first_or_404()
-        
-        columns_data = []
-        for column in sorted(board.columns, key=lambda c: c.position):
-            tasks_data = [
-                {
-                    "id": t.id, 
-                    "title": t.title, 
-                    "description": t.description, 
-                    "position": t.position,
-                    "created_at": t.created_at.isoformat() if hasattr(t, 'created_at') else None,
-                    "updated_at": t.updated_at.isoformat() if hasattr(t, 'updated_at') else None
-                } 
-                for t in sorted(column.tasks, key=lambda t: t.position)
-            ]
-            columns_data.append({
-                "id": column.id, 
-                "name": column.name, 
-                "position": column.position,
-                "tasks": tasks_data
-            })
-            
-        return jsonify({
+        board = db.session.execute(
+            db.select(Board.id, Board.name, Board.version, Board.created_at).where(
+                Board.id == board_id, Board.owned_by(user_id)
+            )
+        ).first()
+        if board is None:
+            abort(404)
+
+        # Si el cliente ya tiene esta versión no hace falta cargar el árbol
+        etag = board_etag(board.id, board.version)
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+
+        response = json_response({
             "id": board.id, 
             "name": board.name, 
-            "columns": columns_data,
-            "created_at": board.created_at.isoformat() if hasattr(board, 'created_at') else None
+            "columns": _cached_board_columns(board.id, board.version),
+            "created_at": isoformat(board.created_at)
         })
+        response.set_etag(etag)
+        return response
     except SQLAlchemyError as e:
-        print(f"Database error in get_board: {e}")
+        logger.error("Database error in get_board: %s", e)
         return jsonify({"message": "Database error occurred"}), 500
 
 @kanban_bp.route("/boards/<int:board_id>", methods=["PUT"])
 def update_board(board_id):
+    return run_operation("update_board", request.get_json(), board_id=board_id)
+
+@kanban_bp.route("/boards/<int:board_id>", methods=["DELETE"])
+def delete_board(board_id):
+    return run_operation("delete_board", board_id=board_id)
+
+@kanban_bp.route("/boards/import", methods=["POST"])
+def import_board():
+    """
+    Importa un tablero completo desde NDJSON (por defecto) o CSV
+    (?format=csv o Content-Type: text/csv). Ver app/transfer.py.
+    """
     user_id = get_current_user()
-    
+    fmt = request.args.get("format") or ("csv" if request.mimetype == "text/csv" else "ndjson")
+    if fmt not in ("ndjson", "csv"):
+        return jsonify({"message": "format must be 'ndjson' or 'csv'"}), 400
+
     try:
-        board = Board.query.filter_by(id=board_id, user_id=user_id).first_or_404()
-        data = request.get_json()
-        name = data.get("name", "").strip()
-        
-        if not name:
-            return jsonify({"message": "Board name is required"}), 400
-        
-        board.name = name
-        if hasattr(board, 'updated_at'):
-            from datetime import datetime
-            board.updated_at = datetime.utcnow()
-            
+        started = time.perf_counter()
+        lines = io.TextIOWrapper(request.stream, encoding="utf-8", newline="")
+        board, columns_count, tasks_count = transfer.import_board(user_id, lines, fmt, request.args.get("name"))
+        adjust_user_stats(user_id, boards=1, columns=columns_count, tasks=tasks_count)
+        stamp_created_boards({board.id})
         db.session.commit()
+        elapsed = time.perf_counter() - started
+
+        rows = columns_count + tasks_count
+        logger.info("Imported board", extra={
+            "board_id": board.id, "rows": rows, "elapsed_ms": round(elapsed * 1000, 1)
+        })
         return jsonify({
-            "id": board.id, 
+            "id": board.id,
             "name": board.name,
-            "message": "Board updated successfully"
-        })
+            "columns_count": columns_count,
+            "tasks_count": tasks_count,
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "rows_per_second": round(rows / elapsed) if elapsed else rows
+        }), 201
+    except OperationError as e:
+        db.session.rollback()
+        return jsonify({"message": e.message}), e.status
+    except UnicodeDecodeError:
+        db.session.rollback()
+        return jsonify({"message": "Import must be UTF-8 encoded"}), 400
     except SQLAlchemyError as e:
-        print(f"Database error in update_board: {e}")
+        logger.error("Database error in import_board: %s", e)
         db.session.rollback()
         return jsonify({"message": "Database error occurred"}), 500
 
-@kanban_bp.route("/boards/<int:board_id>", methods=["DELETE"])
-def delete_board(board_id):
+@kanban_bp.route("/boards/<int:board_id>/export", methods=["GET"])
+def export_board(board_id):
+    """Exporta un tablero como flujo NDJSON (por defecto) o CSV (?format=csv)."""
     user_id = get_current_user()
-    
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in ("ndjson", "csv"):
+        return jsonify({"message": "format must be 'ndjson' or 'csv'"}), 400
+
+    board = Board.query.filter(Board.id == board_id, Board.owned_by(user_id)).first_or_404()
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return Response(stream_with_context(transfer.export_board(board, fmt)), mimetype=mimetype)
+
+# --- Feed de cambios (Server-Sent Events) ---
+
+@kanban_bp.route("/boards/<int:board_id>/events", methods=["GET"])
+def board_events(board_id):
+    """
+    Emite los cambios del tablero como Server-Sent Events. El primer evento,
+    "ready", lleva la versión y el ETag actuales; cada cambio posterior lleva
+    la versión del tablero tras confirmarse. Un evento "resync" pide recargar
+    el tablero con GET /boards/<id> (se envía también si Last-Event-ID no
+    coincide con la versión actual).
+    """
+    user_id = get_current_user()
+    broker = get_event_broker()
+
+    # Suscribirse antes de leer la versión para no perder cambios intermedios
+    subscription = broker.subscribe(board_id)
     try:
-        board = Board.query.filter_by(id=board_id, user_id=user_id).first_or_404()
-        db.session.delete(board)
-        db.session.commit()
-        return jsonify({"message": "Board deleted successfully"})
+        version = db.session.query(Board.version).filter(Board.id == board_id, Board.owned_by(user_id)).scalar()
     except SQLAlchemyError as e:
-        print(f"Database error in delete_board: {e}")
-        db.session.rollback()
+        subscription.close()
+        logger.error("Database error in board_events: %s", e)
         return jsonify({"message": "Database error occurred"}), 500
+    if version is None:
+        subscription.close()
+        return jsonify({"message": "Board not found"}), 404
+    # La conexión vuelve al pool: el stream puede durar horas
+    db.session.remove()
+
+    heartbeat = current_app.config.get("SSE_HEARTBEAT_SECONDS", 15)
+    last_event_id = request.headers.get("Last-Event-ID")
+
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            yield format_sse("ready", {"version": version, "etag": board_etag(board_id, version)}, version)
+            if last_event_id is not None and last_event_id != str(version):
+                yield format_sse("resync", {"board_id": board_id, "version": version}, version)
+            while True:
+                event = subscription.get(timeout=heartbeat)
+                if event is None:
+                    # Comentario para mantener viva la conexión a través de proxies
+                    yield ": heartbeat\n\n"
+                    continue
+                if event["version"] is not None and event["version"] <= version:
+                    # Ya incluido en la versión enviada en "ready"
+                    continue
+                yield format_sse(event["type"], event, event["version"])
+                if event["type"] == "board.deleted":
+                    break
+        finally:
+            subscription.close()
+
+    return Response(generate(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
 
 # --- Rutas para Columnas ---
 
 @kanban_bp.route("/boards/<int:board_id>/columns", methods=["POST"])
 def create_column(board_id):
-    user_id = get_current_user()
-        
-    try:
-        board = Board.query.filter_by(id=board_id, user_id=user_id).first_or_404()
-        data = request.get_json()
-        name = data.get("name", "").strip()
-        
-        if not name:
-            return jsonify({"message": "Column name is required"}), 400
-            
-        # Obtener la posición de la nueva columna (al final)
-        max_position = db.session.query(db.func.max(Column.position)).filter_by(board_id=board_id).scalar() or -1
-        new_position = max_position + 1
-
-        new_column = Column(name=name, board_id=board.id, position=new_position)
-        db.session.add(new_column)
-        db.session.commit()
-        
-        return jsonify({
-            "id": new_column.id, 
-            "name": new_column.name, 
-            "position": new_column.position,
-            "board_id": new_column.board_id
-        }), 201
-    except SQLAlchemyError as e:
-        print(f"Database error in create_column: {e}")
-        db.session.rollback()
-        return jsonify({"message": "Database error occurred"}), 500
+    return run_operation("create_column", request.get_json(), board_id=board_id)
 
 @kanban_bp.route("/columns/<int:column_id>", methods=["PUT"])
 def update_column(column_id):
-    user_id = get_current_user()
-    
-    try:
-        # Verificar que la columna pertenezca al usuario
-        column = db.session.query(Column).join(Board).filter(
-            Column.id == column_id,
-            Board.user_id == user_id
-        ).first_or_404()
-        
-        data = request.get_json()
-        name = data.get("name", "").strip()
-        
-        if not name:
-            return jsonify({"message": "Column name is required"}), 400
-        
-        column.name = name
-        db.session.commit()
-        
-        return jsonify({
-            "id": column.id,
-            "name": column.name,
-            "message": "Column updated successfully"
-        })
-    except SQLAlchemyError as e:
-        print(f"Database error in update_column: {e}")
-        db.session.rollback()
-        return jsonify({"message": "Database error occurred"}), 500
+    return run_operation("update_column", request.get_json(), column_id=column_id)
 
 @kanban_bp.route("/columns/<int:column_id>", methods=["DELETE"])
 def delete_column(column_id):
-    user_id = get_current_user()
-    
-    try:
-        # Verificar que la columna pertenezca al usuario
-        column = db.session.query(Column).join(Board).filter(
-            Column.id == column_id,
-            Board.user_id == user_id
-        ).first_or_404()
-        
-        db.session.delete(column)
-        db.session.commit()
-        return jsonify({"message": "Column deleted successfully"})
-    except SQLAlchemyError as e:
-        print(f"Database error in delete_column: {e}")
-        db.session.rollback()
-        return jsonify({"message": "Database error occurred"}), 500
+    return run_operation("delete_column", column_id=column_id)
+
+@kanban_bp.route("/columns/<int:column_id>/archive", methods=["POST"])
+def archive_column(column_id):
+    return run_operation("archive_column", column_id=column_id)
 
 @kanban_bp.route("/boards/<int:board_id>/columns/reorder", methods=["PUT"])
 def reorder_columns(board_id):
-    user_id = get_current_user()
-    
-    try:
-        board = Board.query.filter_by(id=board_id, user_id=user_id).first_or_404()
-        data = request.get_json()
-        column_orders = data.get("column_orders", [])  # [{"id": 1, "position": 0}, ...]
-        
-        for order_data in column_orders:
-            column = Column.query.filter_by(id=order_data["id"], board_id=board_id).first()
-            if column:
-                column.position = order_data["position"]
-        
-        db.session.commit()
-        return jsonify({"message": "Columns reordered successfully"})
-    except SQLAlchemyError as e:
-        print(f"Database error in reorder_columns: {e}")
-        db.session.rollback()
-        return jsonify({"message": "Database error occurred"}), 500
+    # {"column_orders": [{"id": 1, "position": 0}, ...]}
+    return run_operation("reorder_columns", request.get_json(), board_id=board_id)
+
+@kanban_bp.route("/columns/<int:column_id>/tasks/reorder", methods=["PUT"])
+def reorder_tasks(column_id):
+    # {"task_orders": [{"id": 1, "position": 0}, ...]}
+    return run_operation("reorder_tasks", request.get_json(), column_id=column_id)
 
 # --- Rutas para Tareas ---
 
 @kanban_bp.route("/columns/<int:column_id>/tasks", methods=["POST"])
 def create_task(column_id):
+    return run_operation("create_task", request.get_json(), column_id=column_id)
+
+@kanban_bp.route("/tasks/<int:task_id>", methods=["PUT"])
+def update_task(task_id):
+    return run_operation("update_task", request.get_json(), task_id=task_id)
+
+@kanban_bp.route("/tasks/<int:task_id>", methods=["DELETE"])
+def delete_task(task_id):
+    return run_operation("delete_task", task_id=task_id)
+
+@kanban_bp.route("/tasks/<int:task_id>/archive", methods=["POST"])
+def archive_task(task_id):
+    return run_operation("archive_task", task_id=task_id)
+
+@kanban_bp.route("/tasks/<int:task_id>/move", methods=["PUT"])
+def move_task(task_id):
+    return run_operation("move_task", request.get_json(), task_id=task_id)
+
+# --- Archivo ---
+
+ARCHIVE_DEFAULT_LIMIT = 50
+
+@kanban_bp.route("/boards/<int:board_id>/archive", methods=["GET"])
+@replica_reads
+def get_board_archive(board_id):
+    """
+    Tareas archivadas del tablero, de la más reciente a la más antigua.
+    Paginado por (archived_at, id) con ?limit= y el cursor de X-Next-Cursor.
+    """
     user_id = get_current_user()
-    
+
+    limit = request.args.get("limit", ARCHIVE_DEFAULT_LIMIT, type=int)
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({"message": f"limit must be between 1 and {MAX_PAGE_SIZE}"}), 400
+
     try:
-        # Verificar que la columna pertenezca al usuario
-        column = db.session.query(Column).join(Board).filter(
-            Column.id == column_id,
-            Board.user_id == user_id
-        ).first_or_404()
-        
-        data = request.get_json()
-        title = data.get("title", "").strip()
+        board_exists = db.session.query(Board.id).filter(Board.id == board_id, Board.owned_by(user_id)).scalar()
+        if board_exists is None:
+            return jsonify({"message": "Board not found"}), 404
 
-        if not title:
-            return jsonify({"message": "Task title is required"}), 400
-        
-        # Obtener la posición de la nueva tarea (al final)
-        max_position = db.session.query(db.func.max(Task.position)).filter_by(column_id=column_id).scalar() or -1
-        new_position = max_position + 1
-
-        new_task = Task(
-            title=title, 
-            description=data.get("description", ""), 
-            position=new_position, 
-            column_id=column_id
-        )
-        db.session.add(new_task)
-        db.session.commit()
-        
-        return jsonify({
-            "id": new_task.id, 
-            "title": new_task.title,
-            "description": new_task.description,
-            "position": new_task.position,
-            "column_id": new_task.column_id,
-            "created_at": new_task.created_at.isoformat() if hasattr(new_task, 'created_at') else None
-        }), 201
+        query = db.select(ArchivedTask).where(ArchivedTask.board_id == board_id)
+        cursor = request.args.get("cursor")
+        if cursor:
+            try:
+                archived_at, archived_id = decode_cursor(cursor)
+                archived_at = datetime.fromisoformat(archived_at)
+                archived_id = int(archived_id)
+            except (ValueError, TypeError):
+                return jsonify({"message": "Invalid cursor"}), 400
+            query = query.where(db.or_(
+                ArchivedTask.archived_at < archived_at,
+                db.and_(ArchivedTask.archived_at == archived_at, ArchivedTask.id < archived_id)
+            ))
+        rows = db.session.execute(
+            query.order_by(ArchivedTask.archived_at.desc(), ArchivedTask.id.desc()).limit(limit + 1)
+        ).scalars().all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].archived_at, rows[-1].id)
+
+        response = jsonify([
+            {
+                "id": row.id,
+                "task_id": row.task_id,
+                "title": row.title,
+                "description": row.description,
+                "position": row.position,
+                "column_id": row.column_id,
+                "column_name": row.column_name,
+                "created_at": isoformat(row.created_at),
+                "updated_at": isoformat(row.updated_at),
+                "archived_at": isoformat(row.archived_at)
+            } for row in rows
+        ])
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return response
     except SQLAlchemyError as e:
-        print(f"Database error in create_task: {e}")
-        db.session.rollback()
+        logger.error("Database error in get_board_archive: %s", e)
         return jsonify({"message": "Database error occurred"}), 500
 
-@kanban_bp.route("/tasks/<int:task_id>", methods=["PUT"])
-def update_task(task_id):
+# --- Ruta para operaciones por lotes ---
+
+# Número máximo de operaciones aceptadas en un lote
+MAX_BATCH_OPERATIONS = 500
+
+# Parámetros con ids que se cargan de una vez antes de ejecutar un lote
+_BATCH_PREFETCH_KEYS = {
+    "board_id": "board_ids",
+    "column_id": "column_ids",
+    "new_column_id": "column_ids",
+    "task_id": "task_ids",
+}
+
+@kanban_bp.route("/batch", methods=["POST"])
+def run_batch():
+    """
+    Ejecuta una lista ordenada de operaciones en una sola transacción:
+    {"mode": "atomic" | "best_effort", "operations": [{"op": "move_task", "params": {...}}, ...]}
+    Cada operación puede llevar "if_match" con el ETag esperado de su tablero.
+
+    En el modo "atomic" (por defecto) el primer error deshace todo el lote.
+    En el modo "best_effort" cada operación corre en un savepoint y las que
+    fallan se deshacen sin afectar al resto. En ambos casos hay un solo commit.
+    """
     user_id = get_current_user()
-    
+    data = request.get_json() or {}
+    mode = data.get("mode", "atomic")
+    operations = data.get("operations")
+
+    if mode not in ("atomic", "best_effort"):
+        return jsonify({"message": "mode must be 'atomic' or 'best_effort'"}), 400
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"message": "operations must be a non-empty list"}), 400
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return jsonify({"message": f"A batch accepts at most {MAX_BATCH_OPERATIONS} operations"}), 400
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict) or operation.get("op") not in OPERATIONS:
+            return jsonify({"message": f"Unknown operation at index {index}"}), 400
+        if not isinstance(operation.get("params", {}), dict):
+            return jsonify({"message": f"params must be an object at index {index}"}), 400
+
+    scope = OwnerScope(user_id)
+    results = []
     try:
-        # Verificar que la tarea pertenezca al usuario
-        task = db.session.query(Task).join(Column).join(Board).filter(
-            Task.id == task_id,
-            Board.user_id == user_id
-        ).first_or_404()
-        
-        data = request.get_json()
-        title = data.get("title", "").strip()
-        
-        if not title:
-            return jsonify({"message": "Task title is required"}), 400
-        
-        task.title = title
-        task.description = data.get("description", "")
-        
-        if hasattr(task, 'updated_at'):
-            from datetime import datetime
-            task.updated_at = datetime.utcnow()
-        
-        db.session.commit()
-        
+        # Comprobar la propiedad de todas las entidades con una consulta por tipo
+        # y bloquear sus tableros antes de la primera operación
+        prefetch = {"board_ids": set(), "column_ids": set(), "task_ids": set()}
+        for operation in operations:
+            for key, value in operation.get("params", {}).items():
+                if key in _BATCH_PREFETCH_KEYS and isinstance(value, int):
+                    prefetch[_BATCH_PREFETCH_KEYS[key]].add(value)
+        scope.prefetch(**prefetch, lock=True)
+
+        for index, operation in enumerate(operations):
+            op = OPERATIONS[operation["op"]]
+            params = operation.get("params", {})
+            scope.if_match = parse_etags(operation["if_match"]) if operation.get("if_match") else None
+            if mode == "atomic":
+                try:
+                    body, status = op(scope, params)
+                except OperationError as e:
+                    db.session.rollback()
+                    results.append({"index": index, "status": e.status, "body": {"message": e.message}})
+                    return jsonify({"committed": False, "results": results}), e.status
+            else:
+                try:
+                    with scope.nested():
+                        body, status = op(scope, params)
+                except OperationError as e:
+                    body, status = {"message": e.message}, e.status
+                except SQLAlchemyError as e:
+                    logger.error("Database error in batch operation %s: %s", index, e)
+                    body, status = {"message": "Database error occurred"}, 500
+            results.append({"index": index, "status": status, "body": body})
+
+        versions = scope.commit()
         return jsonify({
-            "id": task.id,
-            "title": task.title,
-            "description": task.description,
-            "message": "Task updated successfully"
+            "committed": True,
+            "results": results,
+            "etags": {str(board_id): board_etag(board_id, version) for board_id, version in versions.items()}
         })
+    except OperationError as e:
+        db.session.rollback()
+        return jsonify({"committed": False, "results": results, "message": e.message}), e.status
     except SQLAlchemyError as e:
-        print(f"Database error in update_task: {e}")
+        logger.error("Database error in run_batch: %s", e)
         db.session.rollback()
         return jsonify({"message": "Database error occurred"}), 500
 
-@kanban_bp.route("/tasks/<int:task_id>", methods=["DELETE"])
-def delete_task(task_id):
+# --- Ruta para obtener estadísticas del usuario ---
+
+@kanban_bp.route("/stats", methods=["GET"])
+@replica_reads
+def get_user_stats():
     user_id = get_current_user()
     
     try:
-        # Verificar que la tarea pertenezca al usuario
-        task = db.session.query(Task).join(Column).join(Board).filter(
-            Task.id == task_id,
-            Board.user_id == user_id
-        ).first_or_404()
+        # Contadores materializados: una búsqueda por clave primaria
+        stats = _user_stats(user_id)
         
-        db.session.delete(task)
-        db.session.commit()
-        return jsonify({"message": "Task deleted successfully"})
+        return jsonify({
+            "boards_count": stats.boards_count,
+            "columns_count": stats.columns_count,
+            "tasks_count": stats.tasks_count
+        })
     except SQLAlchemyError as e:
-        print(f"Database error in delete_task: {e}")
+        logger.error("Database error in get_user_stats: %s", e)
         db.session.rollback()
         return jsonify({"message": "Database error occurred"}), 500
 
-@kanban_bp.route("/tasks/<int:task_id>/move", methods=["PUT"])
-def move_task(task_id):
+@kanban_bp.route("/boards/<int:board_id>/stats", methods=["GET"])
+@replica_reads
+def get_board_stats(board_id):
+    """Desglose de un tablero: número de tareas por columna."""
     user_id = get_current_user()
-    
+
     try:
-        # Verificar que la tarea pertenezca al usuario
-        task = db.session.query(Task).join(Column).join(Board).filter(
-            Task.id == task_id,
-            Board.user_id == user_id
-        ).first_or_404()
-        
-        data = request.get_json()
-        new_column_id = data.get("new_column_id")
-        new_position = data.get("new_position")
-
-        if new_column_id is None or new_position is None:
-            return jsonify({"message": "new_column_id and new_position are required"}), 400
-
-        # Verificar que la nueva columna pertenezca al mismo usuario
-        new_column = db.session.query(Column).join(Board).filter(
-            Column.id == new_column_id,
-            Board.user_id == user_id
-        ).first_or_404()
-        
-        old_column_id = task.column_id
-        old_position = task.position
-        
-        # Si se mueve dentro de la misma columna, reordenar las tareas
-        if old_column_id == new_column_id:
-            # Reordenar tareas en la misma columna
-            if new_position < old_position:
-                # Mover hacia arriba: incrementar posición de tareas entre new_position y old_position-1
-                tasks_to_update = Task.query.filter(
-                    Task.column_id == old_column_id,
-                    Task.position >= new_position,
-                    Task.position < old_position
-                ).all()
-                for t in tasks_to_update:
-                    t.position += 1
-            else:
-                # Mover hacia abajo: decrementar posición de tareas entre old_position+1 y new_position
-                tasks_to_update = Task.query.filter(
-                    Task.column_id == old_column_id,
-                    Task.position > old_position,
-                    Task.position <= new_position
-                ).all()
-                for t in tasks_to_update:
-                    t.position -= 1
-        else:
-            # Movimiento entre columnas diferentes
-            # Decrementar posición de tareas después de la posición original en la columna antigua
-            tasks_old_column = Task.query.filter(
-                Task.column_id == old_column_id,
-                Task.position > old_position
-            ).all()
-            for t in tasks_old_column:
-                t.position -= 1
-            
-            # Incrementar posición de tareas desde new_position en adelante en la nueva columna
-            tasks_new_column = Task.query.filter(
-                Task.column_id == new_column_id,
-                Task.position >= new_position
-            ).all()
-            for t in tasks_new_column:
-                t.position += 1
-        
-        # Actualizar la tarea movida
-        task.column_id = new_column_id
-        task.position = new_position
-        
-        if hasattr(task, 'updated_at'):
-            from datetime import datetime
-            task.updated_at = datetime.utcnow()
-        
-        db.session.commit()
+        board = Board.query.filter(Board.id == board_id, Board.owned_by(user_id)).first_or_404()
+        rows = db.session.query(
+            Column.id, Column.name, db.func.count(Task.id).label("tasks_count")
+        ).outerjoin(Task, Task.column_id == Column.id).filter(
+            Column.board_id == board.id
+        ).group_by(Column.id, Column.name).order_by(*column_order()).all()
+
         return jsonify({
-            "message": "Task moved successfully",
-            "task": {
-                "id": task.id,
-                "title": task.title,
-                "column_id": task.column_id,
-                "position": task.position
-            }
+            "id": board.id,
+            "name": board.name,
+            "columns_count": len(rows),
+            "tasks_count": sum(row.tasks_count for row in rows),
+            "columns": [
+                {"id": row.id, "name": row.name, "tasks_count": row.tasks_count} for row in rows
+            ]
         })
     except SQLAlchemyError as e:
-        print(f"Database error in move_task: {e}")
-        db.session.rollback()
+        logger.error("Database error in get_board_stats: %s", e)
         return jsonify({"message": "Database error occurred"}), 500
 
-# --- Ruta para obtener estadísticas del usuario ---
+# --- Ruta para las estadísticas de la caché ---
 
-@kanban_bp.route("/stats", methods=["GET"])
-def get_user_stats():
-    print("=== GET_USER_STATS CALLED ===")
+@kanban_bp.route("/cache/stats", methods=["GET"])
+def get_cache_stats():
+    stats = get_board_cache().stats()
+    stats["coalesced_loads"] = _board_loads.shared
+    stats["events"] = get_event_broker().stats()
+    if "read_replicas" in current_app.extensions:
+        stats["replicas"] = current_app.extensions["read_replicas"].stats()
+    return jsonify(stats)
+
+# --- Búsqueda ---
+
+SEARCH_DEFAULT_LIMIT = 20
+
+@kanban_bp.route("/search", methods=["GET"])
+@replica_reads
+def search():
+    """
+    Busca tareas del usuario por título y descripción (ver app/search.py).
+    Los resultados van ordenados por relevancia y se paginan con limit y un
+    cursor opaco que se devuelve en la cabecera X-Next-Cursor.
+    """
     user_id = get_current_user()
-    
+
+    terms = (request.args.get("q") or "").strip()
+    if not terms:
+        return jsonify({"message": "q is required"}), 400
+    limit = request.args.get("limit", SEARCH_DEFAULT_LIMIT, type=int)
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({"message": f"limit must be between 1 and {MAX_PAGE_SIZE}"}), 400
+    board_id = request.args.get("board_id", type=int)
+
+    offset = 0
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            (offset,) = decode_cursor(cursor)
+            if not isinstance(offset, int) or offset < 0:
+                raise ValueError("Invalid cursor")
+        except ValueError:
+            return jsonify({"message": "Invalid cursor"}), 400
+
     try:
-        boards_count = Board.query.filter_by(user_id=user_id).count()
-        columns_count = db.session.query(Column).join(Board).filter(Board.user_id == user_id).count()
-        tasks_count = db.session.query(Task).join(Column).join(Board).filter(Board.user_id == user_id).count()
-        
-        print(f"Stats for user {user_id}: {boards_count} boards, {columns_count} columns, {tasks_count} tasks")
-        print("=== GET_USER_STATS SUCCESS ===")
-        
-        return jsonify({
-            "boards_count": boards_count,
-            "columns_count": columns_count,
-            "tasks_count": tasks_count
-        })
+        rows = search_tasks(user_id, terms, board_id=board_id, limit=limit + 1, offset=offset)
     except SQLAlchemyError as e:
-        print(f"Database error in get_user_stats: {e}")
+        logger.error("Database error in search: %s", e)
+        db.session.rollback()
         return jsonify({"message": "Database error occurred"}), 500
 
-# --- Ruta para sincronización completa ---
+    response = jsonify([
+        {
+            "id": r.id,
+            "title": r.title,
+            "description": r.description,
+            "column_id": r.column_id,
+            "board_id": r.board_id,
+            "rank": float(r.rank)
+        } for r in rows[:limit]
+    ])
+    if len(rows) > limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(offset + limit)
+    return response
+
+# --- Ruta para sincronización ---
+
+# Margen que se resta al cursor para no perder cambios de transacciones que
+# confirmaron con una marca de tiempo anterior al cursor. Las filas se marcan
+# al escribirlas, no al confirmar, así que el margen es la duración máxima de
+# una escritura, que OwnerScope.commit() hace cumplir. Los tableros creados
+# por una copia o una importación se marcan al confirmar y se devuelven
+# enteros. El margen supone además los relojes de los servidores sincronizados.
+# Los clientes aplican los cambios de forma idempotente, así que repetir
+# alguno no es un problema.
+SYNC_CURSOR_OVERLAP = MAX_WRITE_DURATION
+
+def _sync_delta(user_id, since):
+    """
+    Devuelve solo las entidades creadas, modificadas o eliminadas desde
+    `since`. De los tableros creados desde entonces se devuelven todas sus
+    columnas y tareas (ver stamp_created_boards).
+    """
+    boards = Board.query.filter(
+        Board.owned_by(user_id),
+        Board.updated_at > since
+    ).order_by(Board.id).all()
+    columns = db.session.query(Column).join(Board).filter(
+        Board.owned_by(user_id),
+        db.or_(Column.updated_at > since, Board.created_at > since)
+    ).order_by(Column.board_id, *column_order()).all()
+    tasks = db.session.query(Task).join(Column).join(Board).filter(
+        Board.owned_by(user_id),
+        db.or_(Task.updated_at > since, Board.created_at > since)
+    ).order_by(Task.column_id, *task_order()).all()
+    deleted = DeletionLog.query.filter(
+        DeletionLog.user_id == user_id,
+        DeletionLog.deleted_at > since
+    ).order_by(DeletionLog.id).all()
+
+    return {
+        "boards": [
+            {
+                "id": b.id,
+                "name": b.name,
+                "is_template": b.is_template,
+                "created_at": b.created_at.isoformat() if b.created_at else None,
+                "updated_at": b.updated_at.isoformat() if b.updated_at else None
+            } for b in boards
+        ],
+        "columns": [
+            {
+                "id": c.id,
+                "board_id": c.board_id,
+                "name": c.name,
+                "position": c.position,
+                "rank": c.rank
+            } for c in columns
+        ],
+        "tasks": [
+            {
+                "id": t.id,
+                "column_id": t.column_id,
+                "title": t.title,
+                "description": t.description,
+                "position": t.position,
+                "rank": t.rank,
+                "created_at": t.created_at.isoformat() if t.created_at else None,
+                "updated_at": t.updated_at.isoformat() if t.updated_at else None
+            } for t in tasks
+        ],
+        "deleted": [
+            {"type": d.entity_type, "id": d.entity_id} for d in deleted
+        ]
+    }
+
+def _replica_sync_timestamp(user_id):
+    """
+    Marca de tiempo de la última escritura del usuario que ya se ve en la
+    réplica. Cada escritura actualiza updated_at de su tablero al confirmar
+    (ver bump_board_versions) y cada eliminación deja su entrada en
+    deletion_log, así que lo que la réplica aún no tiene es posterior.
+    """
+    latest = db.session.execute(db.select(
+        db.select(db.func.max(Board.updated_at)).where(Board.user_id == user_id).scalar_subquery(),
+        db.select(db.func.max(DeletionLog.deleted_at)).where(DeletionLog.user_id == user_id).scalar_subquery()
+    )).one()
+    return max((timestamp for timestamp in latest if timestamp is not None), default=datetime(1970, 1, 1))
+
+# Filas leídas por lote al transmitir la sincronización completa
+SYNC_STREAM_BATCH_SIZE = 500
+
+def _wants_ndjson():
+    """Indica si el cliente pidió la sincronización como flujo NDJSON."""
+    if request.args.get("stream") in ("1", "true"):
+        return True
+    return request.accept_mimetypes.best == "application/x-ndjson"
+
+def _stream_sync(user_id, cursor, sync_timestamp):
+    """
+    Genera la sincronización completa como NDJSON: un registro por tablero,
+    columna y tarea. Las filas se leen por lotes con un cursor del servidor y
+    sin crear objetos del ORM, así que la memoria no crece con el tamaño de la cuenta.
+    """
+    boards = db.session.execute(
+        db.select(Board.id, Board.name, Board.is_template, Board.created_at, Board.updated_at).where(
+            Board.owned_by(user_id)
+        ).order_by(Board.id).execution_options(yield_per=SYNC_STREAM_BATCH_SIZE)
+    )
+    for b in boards:
+        yield json.dumps({
+            "type": "board",
+            "id": b.id,
+            "name": b.name,
+            "is_template": b.is_template,
+            "created_at": b.created_at.isoformat() if b.created_at else None,
+            "updated_at": b.updated_at.isoformat() if b.updated_at else None
+        }) + "\n"
+
+    columns = db.session.execute(
+        db.select(Column.id, Column.board_id, Column.name, Column.position, Column.rank).join(Board).where(
+            Board.owned_by(user_id)
+        ).order_by(Column.board_id, *column_order()).execution_options(
+            yield_per=SYNC_STREAM_BATCH_SIZE
+        )
+    )
+    for c in columns:
+        yield json.dumps({
+            "type": "column",
+            "id": c.id,
+            "board_id": c.board_id,
+            "name": c.name,
+            "position": c.position,
+            "rank": c.rank
+        }) + "\n"
+
+    tasks = db.session.execute(
+        db.select(
+            Task.id, Task.column_id, Task.title, Task.description,
+            Task.position, Task.rank, Task.created_at, Task.updated_at
+        ).join(Column).join(Board).where(
+            Board.owned_by(user_id)
+        ).order_by(Task.column_id, *task_order()).execution_options(
+            yield_per=SYNC_STREAM_BATCH_SIZE
+        )
+    )
+    for t in tasks:
+        yield json.dumps({
+            "type": "task",
+            "id": t.id,
+            "column_id": t.column_id,
+            "title": t.title,
+            "description": t.description,
+            "position": t.position,
+            "rank": t.rank,
+            "created_at": t.created_at.isoformat() if t.created_at else None,
+            "updated_at": t.updated_at.isoformat() if t.updated_at else None
+        }) + "\n"
+
+    yield json.dumps({
+        "type": "cursor",
+        "cursor": cursor,
+        "sync_timestamp": sync_timestamp.isoformat()
+    }) + "\n"
 
 @kanban_bp.route("/sync", methods=["GET"])
+@replica_reads
 def sync_all_data():
+    """
+    Sincronización completa (anidada o en NDJSON) o, con ?since=, solo los
+    cambios desde el cursor. Incluye las plantillas, marcadas con is_template,
+    porque también se editan y se clonan desde los clientes.
+    """
     user_id = get_current_user()
     
     try:
-        boards = Board.query.filter_by(user_id=user_id).all()
-        sync_data = []
-        
-        for board in boards:
-            board_data = {
+        # El nuevo cursor se toma antes de leer para no perder cambios
+        # concurrentes. Una réplica puede ir por detrás de la hora actual, así
+        # que en ella se toma de los datos que ya ha recibido
+        sync_timestamp = _replica_sync_timestamp(user_id) if g.get("read_bind") else datetime.utcnow()
+        cursor = encode_cursor(sync_timestamp)
+
+        since = request.args.get("since")
+        if since:
+            try:
+                since = datetime.fromisoformat(decode_cursor(since)[0]) - SYNC_CURSOR_OVERLAP
+            except (ValueError, TypeError, IndexError):
+                return jsonify({"message": "Invalid cursor"}), 400
+
+            delta = _sync_delta(user_id, since)
+            delta["cursor"] = cursor
+            delta["sync_timestamp"] = sync_timestamp.isoformat()
+            return jsonify(delta)
+
+        if _wants_ndjson():
+            return Response(
+                stream_with_context(_stream_sync(user_id, cursor, sync_timestamp)),
+                mimetype="application/x-ndjson"
+            )
+
+        boards = db.session.execute(
+            db.select(
+                Board.id, Board.name, Board.is_template, Board.version, Board.created_at, Board.updated_at
+            ).where(
+                Board.owned_by(user_id)
+            ).order_by(Board.id)
+        ).all()
+        columns_data = _cached_boards_columns({board.id: board.version for board in boards})
+        sync_data = [
+            {
                 "id": board.id,
                 "name": board.name,
-                "created_at": board.created_at.isoformat() if hasattr(board, 'created_at') else None,
-                "updated_at": board.updated_at.isoformat() if hasattr(board, 'updated_at') else None,
-                "columns": []
-            }
-            
-            for column in sorted(board.columns, key=lambda c: c.position):
-                column_data = {
-                    "id": column.id,
-                    "name": column.name,
-                    "position": column.position,
-                    "tasks": []
-                }
-                
-                for task in sorted(column.tasks, key=lambda t: t.position):
-                    task_data = {
-                        "id": task.id,
-                        "title": task.title,
-                        "description": task.description,
-                        "position": task.position,
-                        "created_at": task.created_at.isoformat() if hasattr(task, 'created_at') else None,
-                        "updated_at": task.updated_at.isoformat() if hasattr(task, 'updated_at') else None
-                    }
-                    column_data["tasks"].append(task_data)
-                
-                board_data["columns"].append(column_data)
-            
-            sync_data.append(board_data)
+                "is_template": board.is_template,
+                "created_at": isoformat(board.created_at),
+                "updated_at": isoformat(board.updated_at),
+                "columns": columns_data[board.id]
+            } for board in boards
+        ]
         
-        return jsonify({
+        return json_response({
             "boards": sync_data,
-            "sync_timestamp": db.func.now()
+            "cursor": cursor,
+            "sync_timestamp": sync_timestamp.isoformat()
         })
     except SQLAlchemyError as e:
-        print(f"Database error in sync_all_data: {e}")
+        logger.error("Database error in sync_all_data: %s", e)
         return jsonify({"message": "Database error occurred"}), 500
\ No newline at end of file
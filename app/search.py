@@ -0,0 +1,75 @@
+"""
+Búsqueda de texto completo sobre el título y la descripción de las tareas.
+
+En PostgreSQL cada tarea guarda su documento en Task.search_vector (tsvector,
+con índice GIN) y las consultas usan websearch_to_tsquery y ts_rank_cd. En el
+resto de bases de datos (SQLite en las pruebas) la columna guarda el texto en
+minúsculas y se busca con LIKE, término a término.
+
+El documento se actualiza al crear y editar tareas (search_document) y con
+una sola sentencia UPDATE tras las importaciones masivas (refresh_search_vectors).
+`flask reindex-search` lo recalcula para todas las tareas.
+"""
+from .db import db
+from .models import Board, Column, Task
+
+# Configuración de texto de PostgreSQL: sin stemming ni stopwords de un idioma
+# concreto, porque los tableros mezclan español e inglés
+SEARCH_CONFIG = "simple"
+
+# Peso del título frente a la descripción en el fallback sin tsvector
+TITLE_WEIGHT = 2
+
+def _is_postgresql():
+    return db.session.get_bind().dialect.name == "postgresql"
+
+def _document_sql(title, description):
+    if _is_postgresql():
+        # El título pesa más que la descripción en ts_rank_cd
+        return db.func.setweight(
+            db.func.to_tsvector(SEARCH_CONFIG, db.func.coalesce(title, "")), db.literal_column("'A'")
+        ).op("||")(
+            db.func.setweight(db.func.to_tsvector(SEARCH_CONFIG, db.func.coalesce(description, "")), db.literal_column("'B'"))
+        )
+    return db.func.lower(db.func.coalesce(title, "") + " " + db.func.coalesce(description, ""))
+
+def search_document(title, description):
+    """Expresión SQL con el documento de búsqueda de una tarea, para asignarla a Task.search_vector."""
+    return _document_sql(db.literal(title or ""), db.literal(description or ""))
+
+def refresh_search_vectors(*criteria):
+    """Recalcula el documento de las tareas que cumplen `criteria` con una sola sentencia. No confirma la transacción."""
+    return Task.query.filter(*criteria).update({
+        Task.search_vector: _document_sql(Task.title, Task.description)
+    }, synchronize_session=False)
+
+def search_tasks(user_id, terms, board_id=None, limit=20, offset=0):
+    """
+    Tareas del usuario que contienen todos los términos, ordenadas por
+    relevancia y después por id descendente. Devuelve filas con id, title,
+    description, column_id, board_id y rank.
+    """
+    if _is_postgresql():
+        query = db.func.websearch_to_tsquery(SEARCH_CONFIG, terms)
+        rank = db.func.ts_rank_cd(Task.search_vector, query)
+        match = [Task.search_vector.op("@@")(query)]
+    else:
+        words = [word for word in terms.lower().split() if word]
+        match = [Task.search_vector.contains(word, autoescape=True) for word in words]
+        rank = sum(
+            db.case((db.func.lower(Task.title).contains(word, autoescape=True), TITLE_WEIGHT), else_=1)
+            for word in words
+        )
+
+    statement = db.select(
+        Task.id, Task.title, Task.description, Task.column_id,
+        Column.board_id, rank.label("rank")
+    ).join(Column, Task.column_id == Column.id).join(
+        Board, Column.board_id == Board.id
+    ).where(Board.owned_by(user_id), *match)
+    if board_id is not None:
+        statement = statement.where(Column.board_id == board_id)
+
+    return db.session.execute(
+        statement.order_by(db.desc("rank"), Task.id.desc()).limit(limit).offset(offset)
+    ).all()
@@ -0,0 +1,50 @@
+"""
+Respuestas JSON rápidas para las rutas de lectura con cuerpos grandes.
+
+json_response() produce exactamente los mismos bytes que jsonify() con la
+configuración por defecto de Flask (claves ordenadas, separadores compactos,
+ASCII con escapes y salto de línea final), pero codifica con orjson si está
+instalado (pip install orjson), varias veces más rápido que el módulo json.
+
+orjson no escapa los caracteres no ASCII ni DEL, así que si el resultado
+contiene alguno se vuelve a codificar con json. Tampoco formatea los números
+en coma flotante igual que json: estas respuestas solo llevan enteros,
+cadenas, booleanos y null (las fechas ya van como cadenas ISO).
+"""
+import json
+from flask import current_app, jsonify
+
+try:
+    import orjson
+except ImportError:  # Dependencia opcional
+    orjson = None
+
+def _compact():
+    # Misma condición que DefaultJSONProvider.response()
+    provider = current_app.json
+    compact = getattr(provider, "compact", None)
+    return compact is not False and not (compact is None and current_app.debug)
+
+def dumps(data):
+    """Serializa `data` como jsonify() (sin el salto de línea final). Devuelve bytes."""
+    if orjson is not None:
+        try:
+            encoded = orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+        except (orjson.JSONEncodeError, TypeError):
+            encoded = None
+        if encoded is not None and encoded.isascii() and b"\x7f" not in encoded:
+            return encoded
+    return json.dumps(data, sort_keys=True, separators=(",", ":")).encode()
+
+def json_response(data, status=200):
+    """Equivalente a jsonify(data) con el codificador rápido."""
+    if not _compact():
+        # En modo debug Flask indenta la salida: se deja a jsonify
+        response = jsonify(data)
+        response.status_code = status
+        return response
+    return current_app.response_class(dumps(data) + b"\n", status=status, mimetype=current_app.json.mimetype)
+
+def isoformat(value):
+    """Fecha en formato ISO, o None."""
+    return value.isoformat() if value is not None else None
@@ -0,0 +1,50 @@
+"""
+Agrupación de cargas concurrentes idénticas ("singleflight").
+
+Cuando varios hilos del mismo worker piden a la vez la misma clave, solo el
+primero ejecuta la función; el resto espera y recibe el mismo resultado (o
+la misma excepción). Así, muchas peticiones simultáneas del mismo tablero en
+la misma versión comparten una única carga y serialización.
+"""
+import threading
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        # Número de llamadas que recibieron el resultado de otra en curso
+        self.shared = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
@@ -0,0 +1,113 @@
+"""
+Contadores materializados por usuario para GET /kanban/stats.
+
+Las operaciones de escritura acumulan las diferencias y las aplican con un
+único UPDATE antes del commit. Si un usuario aún no tiene fila, la crea y la
+calcula desde cero su primera escritura o la primera lectura de sus
+estadísticas, lo que ocurra antes; el comando `flask reconcile-stats`
+recalcula las de todos los usuarios.
+
+Cada recálculo se hace con la fila del usuario bloqueada. Las escrituras
+que ya la actualizaron han confirmado antes de que se obtenga el bloqueo, así
+que el recálculo las incluye; las que llegan después esperan al bloqueo y
+suman su diferencia sobre el resultado.
+
+La misma fila guarda boards_version, que cada escritura incrementa junto con
+los contadores: el ETag del listado de tableros se obtiene de ella con una
+búsqueda por clave primaria en lugar de recorrer los tableros del usuario.
+
+Las plantillas cuentan como tableros, con sus columnas y tareas: los
+contadores miden todo lo que guarda la cuenta, aunque GET /boards las deje
+fuera y se listen en GET /templates.
+"""
+from datetime import datetime
+from sqlalchemy.dialects import postgresql, sqlite
+from .db import db
+from .models import Board, Column, Task, UserStats
+
+def adjust_user_stats(user_id, boards=0, columns=0, tasks=0, changed=False):
+    """
+    Aplica las diferencias a los contadores del usuario e incrementa
+    boards_version si hay alguna o si `changed` indica que la escritura
+    modificó sus tableros. No confirma la transacción.
+    """
+    if not (boards or columns or tasks or changed):
+        return
+    updated = UserStats.query.filter_by(user_id=user_id).update({
+        UserStats.boards_count: UserStats.boards_count + boards,
+        UserStats.columns_count: UserStats.columns_count + columns,
+        UserStats.tasks_count: UserStats.tasks_count + tasks,
+        UserStats.boards_version: UserStats.boards_version + 1,
+        UserStats.updated_at: datetime.utcnow()
+    }, synchronize_session=False)
+    if not updated:
+        # Primera escritura del usuario: se crea la fila y se calcula entera,
+        # incluida esta escritura, que la transacción ya ve
+        reconcile_user_stats([user_id])
+
+def count_board_contents(board_id):
+    """Número de columnas y tareas de un tablero, para descontarlas al eliminarlo."""
+    columns = db.session.query(db.func.count(Column.id)).filter(Column.board_id == board_id).scalar()
+    tasks = db.session.query(db.func.count(Task.id)).join(Column).filter(Column.board_id == board_id).scalar()
+    return columns, tasks
+
+def count_column_tasks(column_id):
+    return db.session.query(db.func.count(Task.id)).filter(Task.column_id == column_id).scalar()
+
+def compute_user_stats(user_ids=None):
+    """Recalcula desde cero los contadores con tres consultas agrupadas. Devuelve {user_id: (tableros, columnas, tareas)}."""
+    boards = db.session.query(Board.user_id, db.func.count(Board.id)).group_by(Board.user_id)
+    columns = db.session.query(Board.user_id, db.func.count(Column.id)).join(
+        Column, Column.board_id == Board.id
+    ).group_by(Board.user_id)
+    tasks = db.session.query(Board.user_id, db.func.count(Task.id)).join(
+        Column, Column.board_id == Board.id
+    ).join(Task, Task.column_id == Column.id).group_by(Board.user_id)
+    # Los tableros pendientes de purga ya se descontaron al eliminarlos
+    boards, columns, tasks = (query.filter(Board.deleted_at.is_(None)) for query in (boards, columns, tasks))
+    if user_ids is not None:
+        boards = boards.filter(Board.user_id.in_(user_ids))
+        columns = columns.filter(Board.user_id.in_(user_ids))
+        tasks = tasks.filter(Board.user_id.in_(user_ids))
+
+    counts = {}
+    for index, query in enumerate((boards, columns, tasks)):
+        for user_id, count in query:
+            counts.setdefault(user_id, [0, 0, 0])[index] = count
+    return {user_id: tuple(values) for user_id, values in counts.items()}
+
+def _insert_missing_stats(user_ids):
+    """Crea a cero las filas que falten sin fallar si otra transacción las crea a la vez."""
+    insert = postgresql.insert if db.session.get_bind().dialect.name == "postgresql" else sqlite.insert
+    db.session.execute(insert(UserStats).values([
+        {"user_id": user_id, "boards_count": 0, "columns_count": 0, "tasks_count": 0, "boards_version": 0}
+        for user_id in user_ids
+    ]).on_conflict_do_nothing(index_elements=[UserStats.user_id]))
+
+def reconcile_user_stats(user_ids):
+    """
+    Reescribe los contadores de los usuarios indicados, creando sus filas si
+    no existen, e incrementa su boards_version. Las filas quedan bloqueadas
+    hasta el final de la transacción, que no se confirma aquí.
+    """
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return {}
+    _insert_missing_stats(user_ids)
+    # Bloquear antes de contar (ver el docstring del módulo)
+    existing = {
+        stats.user_id: stats
+        for stats in UserStats.query.filter(UserStats.user_id.in_(user_ids)).order_by(
+            UserStats.user_id
+        ).with_for_update().populate_existing()
+    }
+    counts = compute_user_stats(user_ids)
+    for user_id in user_ids:
+        boards, columns, tasks = counts.get(user_id, (0, 0, 0))
+        stats = existing[user_id]
+        stats.boards_count = boards
+        stats.columns_count = columns
+        stats.tasks_count = tasks
+        stats.boards_version += 1
+        stats.updated_at = datetime.utcnow()
+    return counts
@@ -0,0 +1,298 @@
+"""
+Importación y exportación masiva de tableros en NDJSON o CSV.
+
+NDJSON: un registro por línea.
+    {"type": "board", "name": "...", "description": "..."}
+    {"type": "column", "id": 10, "name": "...", "position": 0}
+    {"type": "task", "column_id": 10, "title": "...", "description": "...", "position": 0}
+Los ids de columna solo sirven para enlazar las tareas con su columna dentro
+del fichero; al importar se asignan ids nuevos.
+
+CSV: una fila por tarea con las cabeceras de CSV_FIELDS. Una fila sin título
+declara una columna vacía. Las filas de una misma columna comparten
+column_id, que como en NDJSON solo sirve para enlazarlas dentro del fichero;
+si falta, la columna se identifica por su nombre y column_position.
+
+Al importar, las posiciones (y los rangos) se asignan en bloque siguiendo las
+posiciones del fichero, o su orden si no las hay. Las tareas se escriben con
+COPY en PostgreSQL y con inserciones por lotes en el resto de bases de datos.
+"""
+import csv
+import io
+import json
+import logging
+import time
+from datetime import datetime
+from .db import db
+from .models import Board, Column, Task
+from .operations import OperationError
+from .ranking import column_order, initial_ranks, rank_mode_enabled, task_order
+from .search import refresh_search_vectors
+
+CSV_FIELDS = ["column", "column_position", "title", "description", "position", "column_id"]
+
+COPY_FIELDS = ["title", "description", "position", "rank", "column_id", "created_at", "updated_at"]
+
+logger = logging.getLogger(__name__)
+
+# Filas por sentencia COPY o por lote de inserciones
+IMPORT_BATCH_SIZE = 5000
+
+# Filas leídas por lote al exportar
+EXPORT_BATCH_SIZE = 1000
+
+def _parse_ndjson(lines):
+    board = {}
+    columns = {}
+    tasks = []
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise OperationError(f"Invalid JSON on line {line_number}")
+        if not isinstance(record, dict):
+            raise OperationError(f"Invalid record on line {line_number}")
+
+        record_type = record.get("type")
+        if record_type in ("column", "task"):
+            record["position"] = _optional_int(record.get("position"))
+        if record_type == "board":
+            board = record
+        elif record_type == "column":
+            if record.get("id") is None or not record.get("name"):
+                raise OperationError(f"Column on line {line_number} needs an id and a name")
+            columns[record["id"]] = record
+        elif record_type == "task":
+            if record.get("column_id") not in columns:
+                raise OperationError(f"Task on line {line_number} references an unknown column")
+            if not record.get("title"):
+                raise OperationError(f"Task on line {line_number} needs a title")
+            tasks.append(record)
+        # Otros tipos (por ejemplo el resumen de una exportación) se ignoran
+    return board, list(columns.values()), tasks
+
+def _parse_csv(lines):
+    reader = csv.DictReader(lines)
+    if not reader.fieldnames or "column" not in reader.fieldnames or "title" not in reader.fieldnames:
+        raise OperationError("CSV must have at least 'column' and 'title' headers")
+
+    columns = {}
+    tasks = []
+    for row in reader:
+        name = (row.get("column") or "").strip()
+        if not name:
+            raise OperationError(f"Missing column name on line {reader.line_num}")
+        column_position = _optional_int(row.get("column_position"))
+        # Dos columnas pueden llamarse igual: se distinguen por column_id
+        source_id = (row.get("column_id") or "").strip()
+        key = ("id", source_id) if source_id else ("name", name, column_position)
+        if key not in columns:
+            columns[key] = {"id": key, "name": name, "position": column_position}
+        if row.get("title"):
+            tasks.append({
+                "column_id": key,
+                "title": row["title"],
+                "description": row.get("description") or "",
+                "position": _optional_int(row.get("position"))
+            })
+    return {}, list(columns.values()), tasks
+
+def _optional_int(value):
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise OperationError(f"Invalid position {value!r}")
+
+def _in_file_order(records):
+    """Ordena por la posición indicada; los registros sin posición conservan el orden del fichero."""
+    indexed = list(enumerate(records))
+    indexed.sort(key=lambda item: (item[1].get("position") is None, item[1].get("position") or 0, item[0]))
+    return [record for _, record in indexed]
+
+def _copy_tasks(rows):
+    """Escribe las tareas con COPY ... FROM STDIN a través de psycopg2."""
+    cursor = db.session.connection().connection.cursor()
+    try:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        # NULL se escribe como \N para distinguirlo de las cadenas vacías. El
+        # título y la descripción nunca son NULL: con FORCE_NOT_NULL un texto
+        # que sea literalmente \N se guarda como tal
+        writer.writerows(
+            tuple("\\N" if r[field] is None else r[field] for field in COPY_FIELDS)
+            for r in rows
+        )
+        buffer.seek(0)
+        cursor.copy_expert(
+            f"COPY tasks ({', '.join(COPY_FIELDS)}) FROM STDIN "
+            "WITH (FORMAT csv, NULL '\\N', FORCE_NOT_NULL (title, description))",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+def _insert_tasks(rows):
+    if db.session.get_bind().dialect.name == "postgresql":
+        _copy_tasks(rows)
+    else:
+        db.session.execute(db.insert(Task), rows)
+
+def import_board(user_id, lines, fmt, name=None):
+    """
+    Crea un tablero completo a partir de las líneas de un fichero NDJSON o CSV.
+    No confirma la transacción. Devuelve el tablero y el número de columnas y tareas.
+    """
+    if fmt == "csv":
+        board_data, columns, tasks = _parse_csv(lines)
+    else:
+        board_data, columns, tasks = _parse_ndjson(lines)
+
+    board_name = (name or board_data.get("name") or "").strip()
+    if not board_name:
+        raise OperationError("Board name is required")
+
+    now = datetime.utcnow()
+    board = Board(name=board_name, description=board_data.get("description"), user_id=user_id)
+    db.session.add(board)
+    db.session.flush()
+
+    # Columnas: una sola inserción que devuelve los ids en el orden de los parámetros
+    columns = _in_file_order(columns)
+    column_ranks = initial_ranks(len(columns)) if rank_mode_enabled() else [None] * len(columns)
+    column_ids = {}
+    if columns:
+        new_ids = db.session.execute(
+            db.insert(Column).returning(Column.id, sort_by_parameter_order=True),
+            [
+                {
+                    "name": column["name"],
+                    "position": position,
+                    "rank": rank,
+                    "board_id": board.id,
+                    "created_at": now,
+                    "updated_at": now
+                }
+                for position, (column, rank) in enumerate(zip(columns, column_ranks))
+            ]
+        ).scalars().all()
+        column_ids = {column["id"]: new_id for column, new_id in zip(columns, new_ids)}
+
+    # Tareas: posiciones densas por columna calculadas en memoria, sin MAX(position)
+    tasks_by_column = {}
+    for task in tasks:
+        tasks_by_column.setdefault(task["column_id"], []).append(task)
+
+    batch = []
+    for source_column_id, column_tasks in tasks_by_column.items():
+        column_tasks = _in_file_order(column_tasks)
+        ranks = initial_ranks(len(column_tasks)) if rank_mode_enabled() else [None] * len(column_tasks)
+        for position, (task, rank) in enumerate(zip(column_tasks, ranks)):
+            batch.append({
+                "title": str(task["title"])[:500],
+                "description": task.get("description") or "",
+                "position": position,
+                "rank": rank,
+                "column_id": column_ids[source_column_id],
+                "created_at": now,
+                "updated_at": now
+            })
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                _insert_tasks(batch)
+                batch = []
+    if batch:
+        _insert_tasks(batch)
+    if tasks:
+        # COPY no puede calcular el documento de búsqueda: una sola sentencia al final
+        refresh_search_vectors(Task.column_id.in_(column_ids.values()))
+
+    return board, len(columns), len(tasks)
+
+def export_board(board, fmt):
+    """
+    Genera el contenido de un tablero como NDJSON o CSV. Las filas se leen
+    por lotes, así que la memoria no crece con el tamaño del tablero.
+    """
+    started = time.perf_counter()
+    rows = 0
+
+    columns = db.session.execute(
+        db.select(Column.id, Column.name, Column.position).where(
+            Column.board_id == board.id
+        ).order_by(*column_order())
+    ).all()
+    tasks = db.session.execute(
+        db.select(Task.column_id, Task.title, Task.description).join(Column).where(
+            Column.board_id == board.id
+        ).order_by(Column.board_id, Task.column_id, *task_order()).execution_options(
+            yield_per=EXPORT_BATCH_SIZE
+        )
+    )
+
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_FIELDS)
+        column_positions = {c.id: index for index, c in enumerate(columns)}
+        column_names = {c.id: c.name for c in columns}
+        seen_columns = set()
+        task_position = 0
+        previous_column = None
+        for t in tasks:
+            if t.column_id != previous_column:
+                previous_column, task_position = t.column_id, 0
+            seen_columns.add(t.column_id)
+            writer.writerow([
+                column_names[t.column_id], column_positions[t.column_id], t.title, t.description or "",
+                task_position, t.column_id
+            ])
+            task_position += 1
+            rows += 1
+            if rows % EXPORT_BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        # Las columnas vacías se exportan como una fila sin título
+        for c in columns:
+            if c.id not in seen_columns:
+                writer.writerow([c.name, column_positions[c.id], "", "", "", c.id])
+                rows += 1
+        yield buffer.getvalue()
+    else:
+        yield json.dumps({"type": "board", "name": board.name, "description": board.description}) + "\n"
+        for index, c in enumerate(columns):
+            yield json.dumps({"type": "column", "id": c.id, "name": c.name, "position": index}) + "\n"
+            rows += 1
+
+        lines = []
+        task_position = 0
+        previous_column = None
+        for t in tasks:
+            if t.column_id != previous_column:
+                previous_column, task_position = t.column_id, 0
+            lines.append(json.dumps({
+                "type": "task",
+                "column_id": t.column_id,
+                "title": t.title,
+                "description": t.description,
+                "position": task_position
+            }) + "\n")
+            task_position += 1
+            rows += 1
+            if len(lines) >= EXPORT_BATCH_SIZE:
+                yield "".join(lines)
+                lines = []
+        if lines:
+            yield "".join(lines)
+
+    elapsed = time.perf_counter() - started
+    rate = rows / elapsed if elapsed else rows
+    if fmt != "csv":
+        yield json.dumps({"type": "summary", "rows": rows, "elapsed_ms": round(elapsed * 1000, 1)}) + "\n"
+    logger.info("Exported board", extra={
+        "board_id": board.id, "rows": rows, "elapsed_ms": round(elapsed * 1000, 1), "rows_per_second": round(rate)
+    })
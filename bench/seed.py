@@ -0,0 +1,92 @@
+"""
+Datos de prueba para los benchmarks.
+
+Cada forma (SHAPES) indica cuántos tableros, columnas por tablero y tareas
+por columna se crean para el usuario 1, que es el que usan las rutas (ver
+get_current_user). Los tableros se crean con la importación masiva de
+app/transfer.py, así que sembrar cientos de miles de tareas tarda segundos.
+"""
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from app.db import db
+from app.models import Board, Column, Task, User
+from app.stats import reconcile_user_stats
+from app.transfer import import_board
+
+USER_ID = 1
+
+# nombre: (tableros, columnas por tablero, tareas por columna)
+SHAPES = {
+    "many_boards": (200, 4, 10),
+    "wide_boards": (5, 100, 20),
+    "long_columns": (2, 3, 5000),
+}
+
+def board_lines(name, columns, tasks_per_column):
+    """Líneas NDJSON de un tablero con el tamaño indicado."""
+    yield json.dumps({"type": "board", "name": name})
+    for c in range(columns):
+        yield json.dumps({"type": "column", "id": c, "name": f"Column {c}"})
+        for t in range(tasks_per_column):
+            yield json.dumps({
+                "type": "task",
+                "column_id": c,
+                "title": f"Task {c}-{t}",
+                "description": f"Benchmark task {t} in column {c} " + "lorem ipsum " * 4
+            })
+
+def seed(boards, columns, tasks_per_column, reset=False):
+    """
+    Crea los tableros en la base de datos de la aplicación actual y devuelve
+    {board_id: {column_id: [task_id, ...]}}. Con `reset` borra antes todas las tablas.
+    """
+    if reset:
+        db.drop_all()
+    db.create_all()
+    if db.session.get(User, USER_ID) is None:
+        db.session.add(User(id=USER_ID, email="bench@example.com", password="bench"))
+        db.session.flush()
+
+    board_ids = []
+    for b in range(boards):
+        board, _, _ = import_board(USER_ID, board_lines(f"Board {b}", columns, tasks_per_column), "ndjson")
+        board_ids.append(board.id)
+        db.session.commit()
+    reconcile_user_stats([USER_ID])
+    db.session.commit()
+    return layout(board_ids)
+
+def seed_shape(shape, scale=1.0, reset=False):
+    """Igual que seed() para una de las formas de SHAPES, con el número de tareas escalado."""
+    boards, columns, tasks_per_column = SHAPES[shape]
+    return seed(boards, columns, max(1, int(tasks_per_column * scale)), reset=reset)
+
+def layout(board_ids):
+    """Columnas y tareas actuales de los tableros indicados."""
+    result = {board_id: {} for board_id in board_ids}
+    for column_id, board_id in db.session.execute(
+        db.select(Column.id, Column.board_id).where(Column.board_id.in_(board_ids)).order_by(Column.id)
+    ):
+        result[board_id][column_id] = []
+    for task_id, column_id, board_id in db.session.execute(
+        db.select(Task.id, Task.column_id, Column.board_id).join(Column, Task.column_id == Column.id).where(
+            Column.board_id.in_(board_ids)
+        ).order_by(Task.id)
+    ):
+        result[board_id][column_id].append(task_id)
+    return result
+
+def scratch_board():
+    """Tablero vacío para los escenarios que crean y borran entidades."""
+    board = Board(name="Scratch", user_id=USER_ID)
+    db.session.add(board)
+    db.session.commit()
+    reconcile_user_stats([USER_ID])
+    db.session.commit()
+    return board.id
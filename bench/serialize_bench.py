@@ -0,0 +1,171 @@
+"""
+Microbenchmark de la serialización de GET /kanban/boards/<id>.
+
+Compara, sobre un tablero de 10.000 tareas, el serializador anterior (objetos
+del ORM, diccionarios campo a campo y jsonify) con el actual (filas con solo
+los campos necesarios, una sola pasada y json_response). Mide por separado la
+carga (consulta + construcción de la estructura) y la codificación, y
+comprueba que ambos producen exactamente los mismos bytes.
+
+    python bench/serialize_bench.py
+    python bench/serialize_bench.py --database-url $DATABASE_URL --reset --columns 10 --tasks-per-column 1000
+
+Sin orjson instalado la codificación usa el módulo json, igual que jsonify.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from seed import seed
+
+from flask import jsonify
+
+def legacy_board_columns(board_id):
+    """Serializador anterior: objetos del ORM y diccionarios campo a campo."""
+    from app.models import Column, Task
+    from app.ranking import column_order, rank_mode_enabled, task_order
+
+    by_rank = rank_mode_enabled()
+    columns = Column.query.filter_by(board_id=board_id).order_by(*column_order()).all()
+    if not columns:
+        return []
+
+    tasks_by_column = {column.id: [] for column in columns}
+    tasks = Task.query.filter(
+        Task.column_id.in_(tasks_by_column.keys())
+    ).order_by(Task.column_id, *task_order()).all()
+    for t in tasks:
+        column_tasks = tasks_by_column[t.column_id]
+        column_tasks.append({
+            "id": t.id,
+            "title": t.title,
+            "description": t.description,
+            "position": len(column_tasks) if by_rank else t.position,
+            "created_at": t.created_at.isoformat() if t.created_at else None,
+            "updated_at": t.updated_at.isoformat() if t.updated_at else None
+        })
+
+    return [
+        {
+            "id": column.id,
+            "name": column.name,
+            "position": index if by_rank else column.position,
+            "tasks": tasks_by_column[column.id]
+        } for index, column in enumerate(columns)
+    ]
+
+def legacy_board(board_id):
+    from app.models import Board
+    board = Board.query.filter_by(id=board_id).first_or_404()
+    return jsonify({
+        "id": board.id,
+        "name": board.name,
+        "columns": legacy_board_columns(board.id),
+        "created_at": board.created_at.isoformat() if hasattr(board, 'created_at') else None
+    })
+
+def fast_board(board_id):
+    from app.db import db
+    from app.models import Board
+    from app.routes import _load_boards_columns
+    from app.serialization import isoformat, json_response
+    board = db.session.execute(
+        db.select(Board.id, Board.name, Board.created_at).where(Board.id == board_id)
+    ).first()
+    return json_response({
+        "id": board.id,
+        "name": board.name,
+        "columns": _load_boards_columns([board.id])[board.id],
+        "created_at": isoformat(board.created_at)
+    })
+
+def legacy_phases(board_id):
+    from app.models import Board
+    started = time.perf_counter()
+    board = Board.query.filter_by(id=board_id).first_or_404()
+    data = {
+        "id": board.id,
+        "name": board.name,
+        "columns": legacy_board_columns(board.id),
+        "created_at": board.created_at.isoformat()
+    }
+    loaded = time.perf_counter()
+    jsonify(data).get_data()
+    return loaded - started, time.perf_counter() - loaded
+
+def fast_phases(board_id):
+    from app.db import db
+    from app.models import Board
+    from app.routes import _load_boards_columns
+    from app.serialization import isoformat, json_response
+    started = time.perf_counter()
+    board = db.session.execute(
+        db.select(Board.id, Board.name, Board.created_at).where(Board.id == board_id)
+    ).first()
+    data = {
+        "id": board.id,
+        "name": board.name,
+        "columns": _load_boards_columns([board.id])[board.id],
+        "created_at": isoformat(board.created_at)
+    }
+    loaded = time.perf_counter()
+    json_response(data).get_data()
+    return loaded - started, time.perf_counter() - loaded
+
+def measure(phases, board_id, repeat):
+    from app.db import db
+    load, encode = [], []
+    for _ in range(repeat):
+        # Sesión limpia en cada repetición, como en una petición nueva
+        db.session.remove()
+        load_seconds, encode_seconds = phases(board_id)
+        load.append(load_seconds)
+        encode.append(encode_seconds)
+    return statistics.median(load) * 1000, statistics.median(encode) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"),
+                        help="Por defecto, SQLite en un fichero temporal")
+    parser.add_argument("--reset", action="store_true", help="Borra y recrea todas las tablas antes de sembrar")
+    parser.add_argument("--columns", type=int, default=10)
+    parser.add_argument("--tasks-per-column", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=15, help="Repeticiones de cada serializador")
+    parser.add_argument("--ordering-mode", choices=["position", "rank"], default="position")
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if not database_url:
+        database_url = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="kanban-bench-"), "bench.db")
+
+    from app import create_app
+    from app.serialization import orjson
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": database_url,
+        "ORDERING_MODE": args.ordering_mode,
+        "LOG_LEVEL": "WARNING",
+        "METRICS_ENABLED": False,
+    })
+    with app.test_request_context():
+        board_id = next(iter(seed(1, args.columns, args.tasks_per_column, reset=args.reset)))
+        tasks = args.columns * args.tasks_per_column
+
+        legacy_body = legacy_board(board_id).get_data()
+        fast_body = fast_board(board_id).get_data()
+        if legacy_body != fast_body:
+            raise SystemExit("The serializers produce different output")
+
+        print(f"Board {board_id}: {tasks} tasks, {len(fast_body)} bytes, encoder "
+              f"{'orjson' if orjson is not None else 'json'}")
+        print(f"{'serializer':<10} {'load ms':>9} {'encode ms':>10} {'total ms':>9}")
+        results = {}
+        for name, phases in (("legacy", legacy_phases), ("fast", fast_phases)):
+            load_ms, encode_ms = measure(phases, board_id, args.repeat)
+            results[name] = load_ms + encode_ms
+            print(f"{name:<10} {load_ms:>9.1f} {encode_ms:>10.1f} {load_ms + encode_ms:>9.1f}")
+        print(f"Speedup: {results['legacy'] / results['fast']:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -16,8 +16,15 @@ flask --app app:create_app db migrate -m "create users table"
 
 flask --app app:create_app db upgrade
 
+# El comando 'exec' reemplaza el proceso de shell por el del servidor,
+# lo que permite a Docker manejar las señales de forma correcta.
+if [ "$SERVER_MODE" = "production" ]; then
+  # Varios procesos con workers gevent (ver gunicorn.conf.py)
+  echo "Iniciando gunicorn..."
+  exec gunicorn --config gunicorn.conf.py "app:create_app()"
+fi
+
 echo "Iniciando el servidor Flask..."
 
-# Iniciar el servidor Flask. El comando 'exec' reemplaza el proceso de shell
-# por el proceso del servidor Flask, lo que permite a Docker manejar las señales de forma correcta.
+# Servidor de desarrollo de Flask: un solo proceso
 exec flask --app app:create_app run --host=0.0.0.0 --port=5001
@@ -0,0 +1,56 @@
+# Configuración de gunicorn para el modo de producción (SERVER_MODE=production en entrypoint.sh).
+# Todos los valores se pueden ajustar con variables de entorno.
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5001")
+
+# Procesos: por defecto 2 por CPU + 1. Cada uno tiene su propio pool de
+# conexiones (DB_POOL_SIZE + DB_MAX_OVERFLOW, ver app/__init__.py)
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+
+# Workers gevent: cada conexión es una greenlet, así que los suscriptores de
+# GET /kanban/boards/<id>/events, que se quedan abiertos, no agotan el worker.
+# Hasta `worker_connections` conexiones a la vez por proceso
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gevent")
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 1000))
+
+# Solo para GUNICORN_WORKER_CLASS=gthread: hilos por proceso. Cada suscriptor
+# del feed de eventos ocupa uno de ellos mientras está conectado
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+def post_fork(server, worker):
+    if worker_class == "gevent":
+        # Sin esto psycopg2 bloquea todo el worker mientras espera a PostgreSQL
+        try:
+            from psycogreen.gevent import patch_psycopg
+        except ImportError:
+            server.log.warning("psycogreen is not installed; database calls will block gevent workers")
+        else:
+            patch_psycopg()
+
+# Cada worker deja sus métricas en este directorio y GET /metrics suma las de
+# todos (ver app/metrics.py). Los workers lo heredan del entorno del maestro
+metrics_dir = os.environ.setdefault(
+    "METRICS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "kanban-metrics")
+)
+
+def on_starting(server):
+    # Las métricas de una ejecución anterior no deben sumarse a las nuevas
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+graceful_timeout = 30
+keepalive = 5
+
+# Reciclar los workers de vez en cuando limita el crecimiento de memoria;
+# el jitter evita que se reinicien todos a la vez
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
@@ -0,0 +1,59 @@
+"""GET /kanban/boards: recuentos agregados y paginación por clave."""
+
+def _pages(client, limit):
+    boards, cursor = [], None
+    while True:
+        response = client.get("/kanban/boards", query_string={"limit": limit, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        boards.extend(response.get_json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return boards
+
+def test_pages_cover_every_board_once_with_its_counts(client, make_board):
+    expected = {}
+    for b in range(7):
+        board_id = make_board(client, b % 3, b, name=f"Board {b}")
+        expected[board_id] = (b % 3, (b % 3) * b)
+    client.post("/kanban/boards", json={"name": "Empty"})
+
+    boards = _pages(client, limit=3)
+
+    assert [board["name"] for board in boards] == ["Empty"] + [f"Board {b}" for b in reversed(range(7))]
+    for board in boards[1:]:
+        assert (board["columns_count"], board["tasks_count"]) == expected[board["id"]]
+    assert (boards[0]["columns_count"], boards[0]["tasks_count"]) == (0, 0)
+    assert boards == client.get("/kanban/boards").get_json()
+
+def test_templates_are_not_listed(client, make_board):
+    board_id = make_board(client, 2, 2)
+    template = client.post(f"/kanban/boards/{board_id}/clone", json={"as_template": True}).get_json()
+
+    assert [board["id"] for board in _pages(client, limit=1)] == [board_id]
+    assert [board["id"] for board in client.get("/kanban/templates").get_json()] == [template["id"]]
+
+def test_invalid_cursor_and_limit(client):
+    assert client.get("/kanban/boards?cursor=not-a-cursor").status_code == 400
+    assert client.get("/kanban/boards?limit=0").status_code == 400
+
+def test_etag_changes_with_every_write(client, make_board, capture_statements):
+    board_id = make_board(client, 1, 1)
+    etag = client.get("/kanban/boards").headers["ETag"]
+    # Un 304 solo lee la fila de user_stats
+    with capture_statements() as statements:
+        assert client.get("/kanban/boards", headers={"If-None-Match": etag}).status_code == 304
+    assert len(statements) == 1 and "user_stats" in statements[0]
+
+    # Renombrar, añadir contenido, copiar e importar cambian el listado
+    column_id = client.get(f"/kanban/boards/{board_id}").get_json()["columns"][0]["id"]
+    writes = [
+        lambda: client.put(f"/kanban/boards/{board_id}", json={"name": "Renamed"}),
+        lambda: client.post(f"/kanban/columns/{column_id}/tasks", json={"title": "New"}),
+        lambda: client.post(f"/kanban/boards/{board_id}/clone", json={}),
+        lambda: client.post("/kanban/boards/import?name=Imported", data="", content_type="application/x-ndjson"),
+    ]
+    for write in writes:
+        assert write().status_code < 300
+        response = client.get("/kanban/boards", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
@@ -0,0 +1,72 @@
+"""GET /kanban/boards/<id> carga el árbol del tablero con un número fijo de consultas."""
+import threading
+import time
+
+import pytest
+
+from app import routes
+from app.singleflight import SingleFlight
+
+CONCURRENT_REQUESTS = 8
+
+@pytest.mark.parametrize("ordering_mode", ["position", "rank"])
+@pytest.mark.parametrize("columns, tasks_per_column", [(1, 1), (40, 25)])
+def test_get_board_query_count_is_constant(make_app, make_board, capture_statements,
+                                           ordering_mode, columns, tasks_per_column):
+    # Sin caché, para que cada petición cargue el árbol completo
+    app = make_app(BOARD_CACHE_BACKEND="none", ORDERING_MODE=ordering_mode)
+    client = app.test_client()
+    board_id = make_board(client, columns, tasks_per_column)
+
+    with capture_statements() as statements:
+        response = client.get(f"/kanban/boards/{board_id}")
+
+    assert response.status_code == 200
+    # El tablero, sus columnas y todas sus tareas
+    assert len(statements) == 3, statements
+    body = response.get_json()
+    assert [column["position"] for column in body["columns"]] == list(range(columns))
+    for c, column in enumerate(body["columns"]):
+        assert column["name"] == f"Column {c}"
+        assert [task["title"] for task in column["tasks"]] == [f"Task {c}-{t}" for t in range(tasks_per_column)]
+        assert [task["position"] for task in column["tasks"]] == list(range(tasks_per_column))
+
+def test_missing_board_is_404(client):
+    assert client.get("/kanban/boards/999").status_code == 404
+
+def test_concurrent_requests_share_one_load(make_app, make_board, capture_statements, monkeypatch):
+    app = make_app(BOARD_CACHE_BACKEND="none")
+    board_id = make_board(app.test_client(), 3, 4)
+    board_loads = SingleFlight()
+    monkeypatch.setattr(routes, "_board_loads", board_loads)
+    load_boards_columns = routes._load_boards_columns
+
+    def slow_load(board_ids):
+        # La primera carga no termina hasta que el resto de peticiones espera
+        # su resultado (con un límite por si la agrupación no funciona)
+        deadline = time.monotonic() + 5
+        while board_loads.shared < CONCURRENT_REQUESTS - 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return load_boards_columns(board_ids)
+
+    monkeypatch.setattr(routes, "_load_boards_columns", slow_load)
+    barrier = threading.Barrier(CONCURRENT_REQUESTS)
+    responses = []
+
+    def request_board():
+        client = app.test_client()
+        barrier.wait()
+        responses.append(client.get(f"/kanban/boards/{board_id}"))
+
+    with capture_statements() as statements:
+        threads = [threading.Thread(target=request_board) for _ in range(CONCURRENT_REQUESTS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert [response.status_code for response in responses] == [200] * CONCURRENT_REQUESTS
+    assert all(response.get_json() == responses[0].get_json() for response in responses)
+    assert len([s for s in statements if "FROM columns" in s]) == 1
+    assert len([s for s in statements if "FROM tasks" in s]) == 1
+    assert app.test_client().get("/kanban/cache/stats").get_json()["coalesced_loads"] == CONCURRENT_REQUESTS - 1
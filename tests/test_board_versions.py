@@ -0,0 +1,82 @@
+"""
+Versiones de los tableros: ETag, If-Match y bloqueos de las escrituras.
+
+La prueba concurrente solo corre en PostgreSQL: SQLite ignora FOR UPDATE y
+serializa todas las escrituras.
+"""
+import random
+import threading
+
+THREADS = 8
+OPERATIONS_PER_THREAD = 20
+
+def test_if_match_rejects_stale_versions(client, make_board):
+    board_id = make_board(client, 2, 2)
+    etag = client.get(f"/kanban/boards/{board_id}").headers["ETag"]
+
+    response = client.put(f"/kanban/boards/{board_id}", json={"name": "Renamed"}, headers={"If-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+    stale = client.put(f"/kanban/boards/{board_id}", json={"name": "Again"}, headers={"If-Match": etag})
+    assert stale.status_code == 412
+    assert client.get(f"/kanban/boards/{board_id}").get_json()["name"] == "Renamed"
+    assert client.get(f"/kanban/boards/{board_id}", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+def test_column_reorders_and_task_writes_do_not_deadlock(make_app, make_board, pg_url):
+    app = make_app(pg_url, BOARD_CACHE_BACKEND="none")
+    board_id = make_board(app.test_client(), 4, 5)
+    columns = app.test_client().get(f"/kanban/boards/{board_id}").get_json()["columns"]
+    column_ids = [column["id"] for column in columns]
+    task_ids = [task["id"] for column in columns for task in column["tasks"]]
+    failures = []
+    successes = []
+    barrier = threading.Barrier(THREADS)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        client = app.test_client()
+        barrier.wait()
+        for _ in range(OPERATIONS_PER_THREAD):
+            choice = rng.random()
+            if choice < 0.4:
+                order = rng.sample(column_ids, len(column_ids))
+                response = client.put(f"/kanban/boards/{board_id}/columns/reorder", json={
+                    "column_orders": [{"id": column_id, "position": p} for p, column_id in enumerate(order)]
+                })
+            elif choice < 0.7:
+                response = client.post(f"/kanban/columns/{rng.choice(column_ids)}/tasks", json={"title": "New"})
+            else:
+                response = client.put(f"/kanban/tasks/{rng.choice(task_ids)}/move", json={
+                    "new_column_id": rng.choice(column_ids), "new_position": rng.randrange(5)
+                })
+            if response.status_code in (200, 201):
+                successes.append(response.status_code)
+            else:
+                failures.append((response.status_code, response.get_json()))
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert failures == []
+    # Cada escritura incrementa la versión exactamente una vez
+    etag = app.test_client().get(f"/kanban/boards/{board_id}").headers["ETag"]
+    assert etag == f'"b{board_id}v{1 + len(successes)}"'
+
+def test_failed_best_effort_operation_keeps_the_board_version(client, make_board):
+    board_id = make_board(client, 2, 2)
+    etag = client.get(f"/kanban/boards/{board_id}").headers["ETag"]
+    column_ids = [column["id"] for column in client.get(f"/kanban/boards/{board_id}").get_json()["columns"]]
+
+    # reorder_columns toca el tablero antes de validar el orden, que no incluye todas las columnas
+    response = client.post("/kanban/batch", json={"mode": "best_effort", "operations": [
+        {"op": "reorder_columns", "params": {"board_id": board_id, "column_orders": [{"id": column_ids[0], "position": 0}]}}
+    ]})
+
+    assert response.status_code == 200
+    assert response.get_json()["results"][0]["status"] == 400
+    assert response.get_json()["etags"] == {}
+    assert client.get(f"/kanban/boards/{board_id}", headers={"If-None-Match": etag}).status_code == 304
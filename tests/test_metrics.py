@@ -0,0 +1,42 @@
+"""Métricas de /metrics sumadas entre procesos (app/metrics.py)."""
+import json
+
+from app.metrics import DURATION_BUCKETS, MetricsRegistry, SharedMetrics
+
+LABELS = {"method": "GET", "endpoint": "/kanban/boards"}
+
+def test_shared_metrics_add_up_every_process(tmp_path):
+    # Dos registros con su propio fichero en el mismo directorio, como dos workers
+    first, second = MetricsRegistry(), MetricsRegistry()
+    first.observe("duration", LABELS, 0.01, DURATION_BUCKETS)
+    first.observe("duration", LABELS, 0.2, DURATION_BUCKETS)
+    first.inc("slow", LABELS)
+    second.observe("duration", LABELS, 0.3, DURATION_BUCKETS)
+    second.inc("slow", LABELS, 2)
+    first_shared = SharedMetrics(first, str(tmp_path), flush_seconds=60)
+    first_shared.ensure_started()
+    first_shared.flush()
+
+    merged = SharedMetrics(second, str(tmp_path), flush_seconds=60).collect().render().splitlines()
+
+    assert 'duration_bucket{endpoint="/kanban/boards",method="GET",le="0.01"} 1' in merged
+    assert 'duration_bucket{endpoint="/kanban/boards",method="GET",le="0.25"} 2' in merged
+    assert 'duration_bucket{endpoint="/kanban/boards",method="GET",le="+Inf"} 3' in merged
+    assert 'duration_count{endpoint="/kanban/boards",method="GET"} 3' in merged
+    assert 'slow{endpoint="/kanban/boards",method="GET"} 3' in merged
+
+def test_metrics_route_includes_other_workers(make_app, tmp_path):
+    directory = tmp_path / "metrics"
+    directory.mkdir()
+    other = MetricsRegistry()
+    other.observe("kanban_request_duration_seconds", {"method": "GET", "endpoint": "/other-worker"}, 0.1,
+                  DURATION_BUCKETS)
+    (directory / "1-0.json").write_text(json.dumps(other.snapshot()))
+    client = make_app(METRICS_MULTIPROC_DIR=str(directory)).test_client()
+
+    assert client.get("/kanban/boards").status_code == 200
+    body = client.get("/metrics").get_data(as_text=True)
+
+    assert 'kanban_request_duration_seconds_count{endpoint="/other-worker",method="GET"} 1' in body
+    assert 'endpoint="/kanban/boards"' in body
+    assert len(list(directory.glob("*.json"))) == 2
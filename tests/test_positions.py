@@ -0,0 +1,117 @@
+"""
+Posiciones de las tareas con movimientos e inserciones concurrentes.
+
+La prueba concurrente solo corre en PostgreSQL: SQLite ignora FOR UPDATE y
+serializa todas las escrituras, así que no ejercita los bloqueos de
+lock_columns.
+"""
+import random
+import threading
+
+import pytest
+
+from app.db import db
+from app.models import Task
+from app.operations import OperationError, OwnerScope, move_task
+
+from conftest import USER_ID
+
+THREADS = 8
+OPERATIONS_PER_THREAD = 30
+
+def _column_positions(app, column_ids):
+    with app.app_context():
+        rows = db.session.execute(
+            db.select(Task.column_id, Task.position).where(Task.column_id.in_(column_ids))
+        ).all()
+    positions = {column_id: [] for column_id in column_ids}
+    for column_id, position in rows:
+        positions[column_id].append(position)
+    return positions
+
+def _assert_dense(positions):
+    for column_id, column_positions in positions.items():
+        assert sorted(column_positions) == list(range(len(column_positions))), (column_id, sorted(column_positions))
+
+def test_moves_keep_positions_dense(client, make_board, app):
+    board_id = make_board(client, 2, 5)
+    first, second = [c["id"] for c in client.get(f"/kanban/boards/{board_id}").get_json()["columns"]]
+    tasks = [t["id"] for t in client.get(f"/kanban/boards/{board_id}").get_json()["columns"][0]["tasks"]]
+
+    moves = [(tasks[0], first, 3), (tasks[1], second, 0), (tasks[2], second, 99), (tasks[3], first, -4)]
+    for task_id, column_id, position in moves:
+        response = client.put(f"/kanban/tasks/{task_id}/move", json={"new_column_id": column_id, "new_position": position})
+        assert response.status_code == 200
+
+    # Las posiciones fuera de rango se ajustan al principio o al final de la columna
+    assert client.put(f"/kanban/tasks/{tasks[2]}/move", json={
+        "new_column_id": second, "new_position": 99
+    }).get_json()["task"]["position"] == 6
+    _assert_dense(_column_positions(app, [first, second]))
+
+def test_task_moved_to_another_board_meanwhile_is_a_conflict(app, client, make_board):
+    first = make_board(client, 1, 2)
+    second = make_board(client, 1, 0)
+    first_column = client.get(f"/kanban/boards/{first}").get_json()["columns"][0]
+    second_column = client.get(f"/kanban/boards/{second}").get_json()["columns"][0]["id"]
+    task_id = first_column["tasks"][0]["id"]
+
+    with app.app_context():
+        scope = OwnerScope(USER_ID)
+        scope.task(task_id)
+        # Otra petición mueve la tarea a otro tablero después de cargarla. Va en
+        # otro hilo para que no comparta el contexto de aplicación ni la sesión
+        responses = []
+        thread = threading.Thread(target=lambda: responses.append(app.test_client().put(
+            f"/kanban/tasks/{task_id}/move", json={"new_column_id": second_column, "new_position": 0}
+        )))
+        thread.start()
+        thread.join()
+        assert responses[0].status_code == 200
+
+        with pytest.raises(OperationError) as error:
+            move_task(scope, {"task_id": task_id, "new_column_id": first_column["id"], "new_position": 0})
+        assert error.value.status == 409
+        db.session.rollback()
+
+def test_concurrent_moves_and_inserts_keep_positions_dense(make_app, make_board, pg_url):
+    app = make_app(pg_url, BOARD_CACHE_BACKEND="none")
+    board_id = make_board(app.test_client(), 2, 10)
+    columns = app.test_client().get(f"/kanban/boards/{board_id}").get_json()["columns"]
+    target, other = columns[0]["id"], columns[1]["id"]
+    task_ids = [t["id"] for column in columns for t in column["tasks"]]
+    lock = threading.Lock()
+    failures = []
+    barrier = threading.Barrier(THREADS)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        client = app.test_client()
+        barrier.wait()
+        for _ in range(OPERATIONS_PER_THREAD):
+            if rng.random() < 0.3:
+                response = client.post(f"/kanban/columns/{target}/tasks", json={"title": f"Task {seed}"})
+                if response.status_code == 201:
+                    with lock:
+                        task_ids.append(response.get_json()["id"])
+            else:
+                with lock:
+                    task_id = rng.choice(task_ids)
+                # Casi siempre hacia la columna de la prueba, con posiciones que pueden haber quedado fuera de rango
+                column_id = target if rng.random() < 0.8 else other
+                response = client.put(f"/kanban/tasks/{task_id}/move", json={
+                    "new_column_id": column_id, "new_position": rng.randrange(25)
+                })
+            if response.status_code not in (200, 201):
+                failures.append((response.status_code, response.get_json()))
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert failures == []
+    positions = _column_positions(app, [target, other])
+    assert sum(len(column_positions) for column_positions in positions.values()) == len(task_ids)
+    _assert_dense(positions)
@@ -0,0 +1,136 @@
+"""
+Planes de ejecución de las sentencias que lanzan las rutas.
+
+La prueba recorre todas las rutas de kanban_bp con el cliente de pruebas,
+recoge las sentencias SQL que emite cada una tal y como llegan al driver y
+ejecuta EXPLAIN sobre ellas. Falla si alguna recorre una tabla completa, de
+modo que quitar un índice o cambiar una consulta sin índice que la respalde
+se detecta aquí. Al analizar lo que las rutas ejecutan de verdad, las
+consultas comprobadas no pueden quedarse atrás respecto al código.
+
+En PostgreSQL se desactivan los recorridos secuenciales durante el EXPLAIN
+(enable_seqscan = off): con tablas pequeñas el planificador los prefiere
+aunque exista un índice, así que un "Seq Scan" que sobrevive indica que no
+hay ningún índice utilizable.
+"""
+import re
+
+import pytest
+from flask import has_request_context, request
+from sqlalchemy import event
+
+from app.db import db
+
+# Sentencias que no se analizan: inserciones de filas sueltas, control de
+# transacciones y COPY
+_SKIPPED = re.compile(r"^\s*(INSERT INTO \S+ \([^)]*\) VALUES|SAVEPOINT|RELEASE|ROLLBACK|BEGIN|COMMIT|SET|COPY)", re.I)
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def plan_app(request, make_app):
+    if request.param == "sqlite":
+        return make_app(BOARD_CACHE_BACKEND="none")
+    return make_app(request.getfixturevalue("pg_url"), BOARD_CACHE_BACKEND="none")
+
+def _board(client, board_id):
+    return client.get(f"/kanban/boards/{board_id}").get_json()
+
+def _drive_routes(client, make_board):
+    """Llama una vez a cada ruta de kanban_bp con datos reales."""
+    def ok(response):
+        assert response.status_code < 400, (response.request.path, response.get_json())
+        return response
+
+    board_id = make_board(client, 3, 4)
+    spare_id = ok(client.post("/kanban/boards", json={"name": "Spare"})).get_json()["id"]
+    ok(client.get("/kanban/boards"))
+    ok(client.get(f"/kanban/boards/{board_id}"))
+    ok(client.put(f"/kanban/boards/{board_id}", json={"name": "Renamed"}))
+    ok(client.get(f"/kanban/boards/{board_id}/export"))
+    ok(client.get(f"/kanban/boards/{board_id}/export?format=csv"))
+    ok(client.post(f"/kanban/boards/{board_id}/clone", json={}))
+    ok(client.post(f"/kanban/boards/{board_id}/clone", json={"as_template": True}))
+    ok(client.get("/kanban/templates"))
+    events = ok(client.get(f"/kanban/boards/{board_id}/events", buffered=False))
+    events.close()
+
+    columns = _board(client, board_id)["columns"]
+    first, second, third = (column["id"] for column in columns)
+    tasks = [task["id"] for task in columns[0]["tasks"]]
+    ok(client.put(f"/kanban/columns/{first}", json={"name": "First"}))
+    ok(client.put(f"/kanban/boards/{board_id}/columns/reorder", json={
+        "column_orders": [{"id": column_id, "position": p} for p, column_id in enumerate([second, first, third])]
+    }))
+    ok(client.post(f"/kanban/boards/{board_id}/columns", json={"name": "New"}))
+    ok(client.put(f"/kanban/columns/{first}/tasks/reorder", json={
+        "task_orders": [{"id": task_id, "position": p} for p, task_id in enumerate(reversed(tasks))]
+    }))
+    ok(client.post(f"/kanban/columns/{first}/tasks", json={"title": "New"}))
+    ok(client.put(f"/kanban/tasks/{tasks[0]}", json={"title": "Edited", "description": "Text"}))
+    ok(client.put(f"/kanban/tasks/{tasks[0]}/move", json={"new_column_id": second, "new_position": 1}))
+    ok(client.post("/kanban/batch", json={"operations": [
+        {"op": "move_task", "params": {"task_id": tasks[1], "new_column_id": second, "new_position": 0}},
+        {"op": "update_task", "params": {"task_id": tasks[2], "title": "Batched"}}
+    ]}))
+    ok(client.post(f"/kanban/tasks/{tasks[3]}/archive"))
+    ok(client.post(f"/kanban/columns/{third}/archive"))
+    ok(client.get(f"/kanban/boards/{board_id}/archive?limit=1"))
+    ok(client.get("/kanban/stats"))
+    ok(client.get(f"/kanban/boards/{board_id}/stats"))
+    ok(client.get("/kanban/cache/stats"))
+    ok(client.get("/kanban/search?q=Task"))
+    ok(client.get(f"/kanban/search?q=Task&board_id={board_id}&limit=1"))
+    cursor = ok(client.get("/kanban/sync")).get_json()["cursor"]
+    ok(client.get("/kanban/sync?stream=1")).get_data()
+    ok(client.get("/kanban/sync", query_string={"since": cursor}))
+    ok(client.delete(f"/kanban/tasks/{tasks[2]}"))
+    ok(client.delete(f"/kanban/columns/{first}"))
+    ok(client.delete(f"/kanban/boards/{spare_id}"))
+
+def _explain(connection, statement, parameters):
+    """Plan de la sentencia como lista de líneas. EXPLAIN sin ANALYZE no la ejecuta."""
+    if connection.dialect.name == "sqlite":
+        # (id, parent, notused, detail)
+        rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+        return [row[-1] for row in rows]
+    connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    return [row[0] for row in connection.exec_driver_sql("EXPLAIN " + statement, parameters).all()]
+
+def _full_scans(plan, tables):
+    """Líneas del plan que recorren una tabla completa de `tables`."""
+    scans = []
+    for line in plan:
+        # PostgreSQL: "Seq Scan on tasks"; SQLite: "SCAN tasks" (con "USING INDEX" no es completo)
+        match = re.search(r"Seq Scan on (\w+)", line) or re.match(r"\s*SCAN (\w+)(?!.* USING )", line)
+        if match and match.group(1) in tables:
+            scans.append(line.strip())
+    return scans
+
+def test_route_statements_use_indexes(plan_app, make_board):
+    client = plan_app.test_client()
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and not executemany and not _SKIPPED.match(statement):
+            executed.append((request.endpoint, statement, parameters))
+
+    with plan_app.app_context():
+        engine = db.engine
+        tables = set(db.metadata.tables)
+    event.listen(engine, "after_cursor_execute", record)
+    try:
+        _drive_routes(client, make_board)
+    finally:
+        event.remove(engine, "after_cursor_execute", record)
+
+    # /cache/stats no consulta la base de datos
+    endpoints = {rule.endpoint for rule in plan_app.url_map.iter_rules() if rule.endpoint.startswith("kanban.")}
+    assert endpoints - {endpoint for endpoint, _, _ in executed} <= {"kanban.get_cache_stats"}
+
+    failures = []
+    with engine.connect() as connection:
+        for endpoint, statement, parameters in executed:
+            with connection.begin():
+                scans = _full_scans(_explain(connection, statement, parameters), tables)
+            if scans:
+                failures.append(f"{endpoint}: {' / '.join(scans)}\n    {statement}")
+    assert not failures, "\n".join(dict.fromkeys(failures))
@@ -0,0 +1,42 @@
+"""Modo "rank": claves de orden lexicográficas (app/ranking.py)."""
+import pytest
+
+from app import operations
+from app.db import db
+from app.models import Column, Task
+
+# Límite reducido para superarlo varias veces con pocas inserciones
+MAX_RANK_LENGTH = 2
+APPENDS = 150
+
+@pytest.fixture
+def rank_app(make_app, monkeypatch):
+    monkeypatch.setattr(operations, "MAX_RANK_LENGTH", MAX_RANK_LENGTH)
+    return make_app(ORDERING_MODE="rank", BOARD_CACHE_BACKEND="none")
+
+def test_appending_tasks_past_the_rank_limit_rebalances_the_column(rank_app, make_board):
+    client = rank_app.test_client()
+    board_id = make_board(client, 1, 0)
+    column_id = client.get(f"/kanban/boards/{board_id}").get_json()["columns"][0]["id"]
+
+    for i in range(APPENDS):
+        response = client.post(f"/kanban/columns/{column_id}/tasks", json={"title": f"Task {i}"})
+        assert response.status_code == 201, response.get_json()
+
+    tasks = client.get(f"/kanban/boards/{board_id}").get_json()["columns"][0]["tasks"]
+    assert [task["title"] for task in tasks] == [f"Task {i}" for i in range(APPENDS)]
+    with rank_app.app_context():
+        assert db.session.query(db.func.max(db.func.length(Task.rank))).scalar() <= MAX_RANK_LENGTH
+
+def test_appending_columns_past_the_rank_limit_rebalances_the_board(rank_app):
+    client = rank_app.test_client()
+    board_id = client.post("/kanban/boards", json={"name": "Board"}).get_json()["id"]
+
+    for i in range(APPENDS):
+        response = client.post(f"/kanban/boards/{board_id}/columns", json={"name": f"Column {i}"})
+        assert response.status_code == 201, response.get_json()
+
+    columns = client.get(f"/kanban/boards/{board_id}").get_json()["columns"]
+    assert [column["name"] for column in columns] == [f"Column {i}" for i in range(APPENDS)]
+    with rank_app.app_context():
+        assert db.session.query(db.func.max(db.func.length(Column.rank))).scalar() <= MAX_RANK_LENGTH
@@ -0,0 +1,68 @@
+"""Contadores materializados de GET /kanban/stats (app/stats.py)."""
+import threading
+
+from app.db import db
+from app.models import UserStats
+from app.stats import compute_user_stats
+
+from conftest import USER_ID
+
+READERS = 8
+WRITERS = 4
+TASKS_PER_WRITER = 10
+
+def _stats_row(app):
+    with app.app_context():
+        stats = db.session.get(UserStats, USER_ID)
+        return stats and (stats.boards_count, stats.columns_count, stats.tasks_count)
+
+def _forget_stats(app):
+    """Borra la fila del usuario, como en una cuenta anterior a los contadores."""
+    with app.app_context():
+        UserStats.query.delete()
+        db.session.commit()
+
+def test_first_write_creates_the_row_with_existing_data(app, client, make_board):
+    make_board(client, 2, 3)
+    _forget_stats(app)
+
+    client.post("/kanban/boards", json={"name": "Second"})
+
+    assert _stats_row(app) == (2, 2, 6)
+    assert client.get("/kanban/stats").get_json() == {"boards_count": 2, "columns_count": 2, "tasks_count": 6}
+
+def test_concurrent_first_reads_and_writes_keep_counters_exact(make_app, make_board, pg_url):
+    app = make_app(pg_url)
+    board_id = make_board(app.test_client(), 2, 3)
+    column_id = app.test_client().get(f"/kanban/boards/{board_id}").get_json()["columns"][0]["id"]
+    _forget_stats(app)
+    barrier = threading.Barrier(READERS + WRITERS)
+    failures = []
+
+    def read():
+        client = app.test_client()
+        barrier.wait()
+        response = client.get("/kanban/stats")
+        if response.status_code != 200:
+            failures.append((response.status_code, response.get_json()))
+
+    def write():
+        client = app.test_client()
+        barrier.wait()
+        for _ in range(TASKS_PER_WRITER):
+            response = client.post(f"/kanban/columns/{column_id}/tasks", json={"title": "New"})
+            if response.status_code != 201:
+                failures.append((response.status_code, response.get_json()))
+
+    threads = [threading.Thread(target=read) for _ in range(READERS)]
+    threads += [threading.Thread(target=write) for _ in range(WRITERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert failures == []
+    with app.app_context():
+        expected = compute_user_stats([USER_ID])[USER_ID]
+    assert expected == (1, 2, 6 + WRITERS * TASKS_PER_WRITER)
+    assert _stats_row(app) == expected
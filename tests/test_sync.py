@@ -0,0 +1,98 @@
+"""GET /kanban/sync: sincronización completa e incremental."""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import operations, routes, transfer
+from app.db import db
+
+def _replicate(app):
+    """Copia todas las filas del primario a la réplica, como bench/replica_check.py."""
+    with app.app_context():
+        with db.engine.connect() as source, db.engines["replica_0"].begin() as target:
+            for table in reversed(db.metadata.sorted_tables):
+                target.execute(table.delete())
+            for table in db.metadata.sorted_tables:
+                rows = [dict(row._mapping) for row in source.execute(table.select())]
+                if rows:
+                    target.execute(table.insert(), rows)
+
+@pytest.fixture
+def replica_app(make_app, tmp_path, monkeypatch):
+    # Sin margen en el cursor, para que un cursor adelantado pierda cambios
+    monkeypatch.setattr(routes, "SYNC_CURSOR_OVERLAP", timedelta(0))
+    app = make_app(
+        SQLALCHEMY_BINDS={"replica_0": "sqlite:///" + str(tmp_path / "replica.db")},
+        REPLICA_STICKY_SECONDS=0
+    )
+    with app.app_context():
+        db.metadata.create_all(db.engines["replica_0"])
+    return app
+
+def test_delta_after_a_lagging_replica_keeps_later_writes(replica_app):
+    client = replica_app.test_client()
+    client.post("/kanban/boards", json={"name": "Replicated"})
+    _replicate(replica_app)
+    # La réplica aún no tiene este tablero cuando se lee la sincronización completa
+    client.post("/kanban/boards", json={"name": "Lagging"})
+
+    full = client.get("/kanban/sync").get_json()
+    assert [board["name"] for board in full["boards"]] == ["Replicated"]
+
+    _replicate(replica_app)
+    delta = client.get("/kanban/sync", query_string={"since": full["cursor"]}).get_json()
+    assert "Lagging" in [board["name"] for board in delta["boards"]]
+    assert replica_app.extensions["read_replicas"].stats()["primary_reads"] == 0
+
+def test_templates_are_flagged_in_every_sync_format(client, make_board):
+    board_id = make_board(client, 1, 1)
+    # Crea los contadores antes de clonar para comprobar también su ajuste incremental
+    assert client.get("/kanban/stats").get_json()["boards_count"] == 1
+    template_id = client.post(f"/kanban/boards/{board_id}/clone", json={"as_template": True}).get_json()["id"]
+    expected = {board_id: False, template_id: True}
+
+    nested = client.get("/kanban/sync").get_json()
+    assert {board["id"]: board["is_template"] for board in nested["boards"]} == expected
+
+    records = [json.loads(line) for line in client.get("/kanban/sync?stream=1").get_data(as_text=True).splitlines()]
+    assert {r["id"]: r["is_template"] for r in records if r["type"] == "board"} == expected
+
+    delta = client.get("/kanban/sync", query_string={"since": routes.encode_cursor(datetime(2000, 1, 1))}).get_json()
+    assert {board["id"]: board["is_template"] for board in delta["boards"]} == expected
+
+    # Las plantillas cuentan en las estadísticas de la cuenta
+    assert client.get("/kanban/stats").get_json() == {"boards_count": 2, "columns_count": 2, "tasks_count": 2}
+
+def test_delta_includes_boards_imported_in_a_long_transaction(client, monkeypatch):
+    cursor = client.get("/kanban/sync").get_json()["cursor"]
+
+    # La importación empezó (y marcó sus filas) mucho antes de confirmar
+    class EarlyClock(datetime):
+        @classmethod
+        def utcnow(cls):
+            return datetime.utcnow() - timedelta(hours=1)
+    monkeypatch.setattr(transfer, "datetime", EarlyClock)
+    lines = [{"type": "column", "id": 1, "name": "Column"}, {"type": "task", "column_id": 1, "title": "Slow"}]
+    response = client.post("/kanban/boards/import?name=Imported", data="\n".join(json.dumps(line) for line in lines),
+                           content_type="application/x-ndjson")
+    assert response.status_code == 201
+
+    delta = client.get("/kanban/sync", query_string={"since": cursor}).get_json()
+    assert [board["name"] for board in delta["boards"]] == ["Imported"]
+    assert [column["name"] for column in delta["columns"]] == ["Column"]
+    assert [task["title"] for task in delta["tasks"]] == ["Slow"]
+
+def test_writes_longer_than_the_cursor_overlap_are_rejected(client, monkeypatch):
+    board_id = client.post("/kanban/boards", json={"name": "Board"}).get_json()["id"]
+    monkeypatch.setattr(operations, "MAX_WRITE_DURATION", timedelta(microseconds=-1))
+
+    response = client.put(f"/kanban/boards/{board_id}", json={"name": "Renamed"})
+    assert response.status_code == 503
+    batch = client.post("/kanban/batch", json={"operations": [
+        {"op": "update_board", "params": {"board_id": board_id, "name": "Renamed"}}
+    ]})
+    assert batch.status_code == 503
+    assert client.get(f"/kanban/boards/{board_id}").get_json()["name"] == "Board"
+    # Crear o copiar tableros no tiene límite: se marcan al confirmar
+    assert client.post(f"/kanban/boards/{board_id}/clone", json={}).status_code == 201
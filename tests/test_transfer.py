@@ -0,0 +1,62 @@
+"""Importación y exportación de tableros (app/transfer.py)."""
+import json
+
+import pytest
+
+LITERAL_NULL = "\\N"
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def any_client(request, make_app):
+    """Cliente sobre SQLite (inserciones por lotes) y sobre PostgreSQL (COPY)."""
+    if request.param == "sqlite":
+        return make_app().test_client()
+    return make_app(request.getfixturevalue("pg_url")).test_client()
+
+def test_literal_null_marker_survives_import(any_client):
+    lines = [
+        {"type": "board", "name": "Board"},
+        {"type": "column", "id": 1, "name": "Column"},
+        {"type": "task", "column_id": 1, "title": LITERAL_NULL, "description": LITERAL_NULL},
+        {"type": "task", "column_id": 1, "title": "Quoted, \"text\"", "description": ""},
+    ]
+    response = any_client.post("/kanban/boards/import", data="\n".join(json.dumps(line) for line in lines),
+                               content_type="application/x-ndjson")
+    assert response.status_code == 201
+
+    board = any_client.get(f"/kanban/boards/{response.get_json()['id']}").get_json()
+    tasks = board["columns"][0]["tasks"]
+    assert [(task["title"], task["description"]) for task in tasks] == [
+        (LITERAL_NULL, LITERAL_NULL), ("Quoted, \"text\"", "")
+    ]
+
+def _import(client, body, fmt):
+    content_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    response = client.post("/kanban/boards/import?name=Imported", data=body, content_type=content_type)
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()["id"]
+
+def _board_tree(client, board_id):
+    columns = client.get(f"/kanban/boards/{board_id}").get_json()["columns"]
+    return [(column["name"], [task["title"] for task in column["tasks"]]) for column in columns]
+
+def test_csv_round_trip_keeps_columns_with_the_same_name(any_client):
+    board_id = any_client.post("/kanban/boards", json={"name": "Board"}).get_json()["id"]
+    for name, titles in (("Done", ["A", "B"]), ("Done", ["C"]), ("Empty", [])):
+        column_id = any_client.post(f"/kanban/boards/{board_id}/columns", json={"name": name}).get_json()["id"]
+        for title in titles:
+            any_client.post(f"/kanban/columns/{column_id}/tasks", json={"title": title})
+
+    exported = any_client.get(f"/kanban/boards/{board_id}/export?format=csv").get_data(as_text=True)
+    copy_id = _import(any_client, exported, "csv")
+
+    assert _board_tree(any_client, copy_id) == [("Done", ["A", "B"]), ("Done", ["C"]), ("Empty", [])]
+
+def test_csv_without_column_ids_uses_name_and_position(client):
+    board_id = _import(client, "\n".join([
+        "column,column_position,title",
+        "Done,0,A",
+        "Done,1,B",
+        "Done,0,C",
+    ]), "csv")
+
+    assert _board_tree(client, board_id) == [("Done", ["A", "C"]), ("Done", ["B"])]